@@ -0,0 +1,36 @@
+"""Change log for incremental list sync
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '002'
+down_revision: Union[str, None] = '001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Monotonic journal of writes to orders, tables and menu items
+    op.create_table(
+        'change_log',
+        sa.Column('id', sa.Integer(), nullable=False, autoincrement=True),
+        sa.Column('entity', sa.String(20), nullable=False),
+        sa.Column('entity_id', sa.Integer(), nullable=False),
+        sa.Column('operation', sa.String(10), nullable=False),
+        sa.Column('changed_at', sa.DateTime(), server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_change_log_entity_id', 'change_log', ['entity', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_change_log_entity_id', table_name='change_log')
+    op.drop_table('change_log')
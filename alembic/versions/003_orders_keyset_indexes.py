@@ -0,0 +1,29 @@
+"""Indexes for keyset pagination and status queries on orders
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '003'
+down_revision: Union[str, None] = '002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_orders_created_at', 'orders', ['created_at'])
+    op.create_index('ix_orders_status_created_at', 'orders', ['status', 'created_at'])
+    op.create_index('ix_orders_table_id_status', 'orders', ['table_id', 'status'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_orders_table_id_status', table_name='orders')
+    op.drop_index('ix_orders_status_created_at', table_name='orders')
+    op.drop_index('ix_orders_created_at', table_name='orders')
@@ -0,0 +1,151 @@
+"""Move order lines from the orders.items JSON column into order_items
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-18 12:00:00.000000
+
+The backfill streams orders in id order and commits every batch on its
+own, so an interrupted upgrade continues from the last copied order when
+it is run again.
+"""
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '004'
+down_revision: Union[str, None] = '003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Orders read per query and order lines written per INSERT statement
+CHUNK_SIZE = 500
+LINES_PER_STATEMENT = 1000
+
+orders = sa.table(
+    'orders',
+    sa.column('id', sa.Integer),
+    sa.column('items', sa.JSON),
+)
+
+order_items = sa.table(
+    'order_items',
+    sa.column('order_id', sa.Integer),
+    sa.column('menu_item_id', sa.Integer),
+    sa.column('name', sa.String),
+    sa.column('price', sa.Float),
+    sa.column('quantity', sa.Integer),
+)
+
+
+def _lines(order_id, items):
+    if isinstance(items, str):
+        items = json.loads(items)
+    for item in items or []:
+        yield {
+            'order_id': order_id,
+            'menu_item_id': item['menu_item_id'],
+            'name': item.get('name') or '',
+            'price': item.get('price') or 0.0,
+            'quantity': item.get('quantity') or 1,
+        }
+
+
+def _backfill(connection) -> None:
+    # Every INSERT holds only whole orders, so the highest copied order_id
+    # is a safe point to resume from
+    last_id = connection.execute(
+        sa.select(sa.func.coalesce(sa.func.max(order_items.c.order_id), 0))
+    ).scalar()
+
+    while True:
+        rows = connection.execute(
+            sa.select(orders.c.id, orders.c['items'])
+            .where(orders.c.id > last_id)
+            .order_by(orders.c.id)
+            .limit(CHUNK_SIZE)
+        ).all()
+        if not rows:
+            break
+
+        pending = []
+        for order_id, items in rows:
+            pending.extend(_lines(order_id, items))
+            if len(pending) >= LINES_PER_STATEMENT:
+                connection.execute(order_items.insert().values(pending))
+                pending = []
+        if pending:
+            connection.execute(order_items.insert().values(pending))
+
+        last_id = rows[-1].id
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+
+    if not sa.inspect(connection).has_table('order_items'):
+        op.create_table(
+            'order_items',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('order_id', sa.Integer(), nullable=False),
+            sa.Column('menu_item_id', sa.Integer(), nullable=False),
+            sa.Column('name', sa.String(100), nullable=False),
+            sa.Column('price', sa.Float(), nullable=False),
+            sa.Column('quantity', sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(['order_id'], ['orders.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_order_items_id', 'order_items', ['id'])
+        op.create_index('ix_order_items_order_id', 'order_items', ['order_id'])
+        op.create_index('ix_order_items_menu_item_id', 'order_items', ['menu_item_id'])
+
+    # Each INSERT commits on its own instead of one long write transaction
+    with op.get_context().autocommit_block():
+        _backfill(connection)
+
+    with op.batch_alter_table('orders') as batch_op:
+        batch_op.drop_column('items')
+
+
+def downgrade() -> None:
+    connection = op.get_bind()
+
+    with op.batch_alter_table('orders') as batch_op:
+        batch_op.add_column(sa.Column('items', sa.JSON(), nullable=True))
+
+    last_id = 0
+    while True:
+        ids = connection.execute(
+            sa.select(orders.c.id)
+            .where(orders.c.id > last_id)
+            .order_by(orders.c.id)
+            .limit(CHUNK_SIZE)
+        ).scalars().all()
+        if not ids:
+            break
+
+        items = {order_id: [] for order_id in ids}
+        lines = connection.execute(
+            sa.select(order_items)
+            .where(order_items.c.order_id.in_(ids))
+        ).all()
+        for line in lines:
+            items[line.order_id].append({
+                'menu_item_id': line.menu_item_id,
+                'name': line.name,
+                'quantity': line.quantity,
+                'price': line.price,
+            })
+        for order_id, order_lines in items.items():
+            connection.execute(
+                orders.update().where(orders.c.id == order_id).values(items=order_lines)
+            )
+
+        last_id = ids[-1]
+
+    op.drop_index('ix_order_items_menu_item_id', table_name='order_items')
+    op.drop_index('ix_order_items_order_id', table_name='order_items')
+    op.drop_index('ix_order_items_id', table_name='order_items')
+    op.drop_table('order_items')
@@ -0,0 +1,63 @@
+"""Pre-aggregated sales rollups for analytics
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-18 14:00:00.000000
+
+The tables start empty; fill them from existing orders with
+POST /api/analytics/rebuild.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '005'
+down_revision: Union[str, None] = '004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'sales_daily',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('orders_completed', sa.Integer(), nullable=False),
+        sa.Column('orders_cancelled', sa.Integer(), nullable=False),
+        sa.Column('items_sold', sa.Integer(), nullable=False),
+        sa.Column('revenue', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('day')
+    )
+    op.create_table(
+        'sales_hourly',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('hour', sa.Integer(), nullable=False),
+        sa.Column('orders_completed', sa.Integer(), nullable=False),
+        sa.Column('revenue', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('day', 'hour')
+    )
+    op.create_table(
+        'sales_by_category',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('category', sa.String(50), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('revenue', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('day', 'category')
+    )
+    op.create_table(
+        'sales_by_menu_item',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('menu_item_id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(100), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('revenue', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('day', 'menu_item_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('sales_by_menu_item')
+    op.drop_table('sales_by_category')
+    op.drop_table('sales_hourly')
+    op.drop_table('sales_daily')
@@ -0,0 +1,58 @@
+"""FTS5 index over menu item names and descriptions
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '008'
+down_revision: Union[str, None] = '007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # FTS5 есть только в SQLite; на других СУБД поиск работает через ILIKE
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    op.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS menu_items_fts USING fts5(
+            name, description,
+            content='menu_items', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )
+    """)
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS menu_items_fts_ai AFTER INSERT ON menu_items BEGIN
+            INSERT INTO menu_items_fts(rowid, name, description) VALUES (new.id, new.name, new.description);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS menu_items_fts_ad AFTER DELETE ON menu_items BEGIN
+            INSERT INTO menu_items_fts(menu_items_fts, rowid, name, description)
+            VALUES ('delete', old.id, old.name, old.description);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS menu_items_fts_au AFTER UPDATE OF name, description ON menu_items BEGIN
+            INSERT INTO menu_items_fts(menu_items_fts, rowid, name, description)
+            VALUES ('delete', old.id, old.name, old.description);
+            INSERT INTO menu_items_fts(rowid, name, description) VALUES (new.id, new.name, new.description);
+        END
+    """)
+    # Индексируем уже существующие блюда
+    op.execute("INSERT INTO menu_items_fts(menu_items_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    op.execute("DROP TRIGGER IF EXISTS menu_items_fts_au")
+    op.execute("DROP TRIGGER IF EXISTS menu_items_fts_ad")
+    op.execute("DROP TRIGGER IF EXISTS menu_items_fts_ai")
+    op.execute("DROP TABLE IF EXISTS menu_items_fts")
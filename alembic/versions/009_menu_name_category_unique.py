@@ -0,0 +1,40 @@
+"""Unique menu item name within a category
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-18 18:00:00.000000
+
+Bulk menu import upserts on (name, category). The upgrade refuses to
+run while duplicates exist and lists them: which row survives is the
+owner's call (order lines still point at both), so they are renamed or
+merged by hand before migrating again.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '009'
+down_revision: Union[str, None] = '008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    duplicates = op.get_bind().execute(sa.text("""
+        SELECT name, category, COUNT(*) AS copies FROM menu_items
+        GROUP BY name, category HAVING COUNT(*) > 1
+        ORDER BY category, name
+    """)).all()
+    if duplicates:
+        pairs = "\n".join(f"  {name!r} / {category!r}: {copies} rows" for name, category, copies in duplicates)
+        raise RuntimeError(
+            "menu_items has duplicate (name, category) pairs; rename or merge them "
+            f"and run the upgrade again:\n{pairs}"
+        )
+    op.create_index('uq_menu_items_name_category', 'menu_items', ['name', 'category'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('uq_menu_items_name_category', table_name='menu_items')
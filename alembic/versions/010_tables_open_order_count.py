@@ -0,0 +1,37 @@
+"""Open order counter on restaurant tables
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '010'
+down_revision: Union[str, None] = '009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('restaurant_tables') as batch_op:
+        batch_op.add_column(sa.Column('open_order_count', sa.Integer(), nullable=False, server_default='0'))
+
+    # Счётчики и занятость по текущим открытым заказам
+    op.execute("""
+        UPDATE restaurant_tables SET open_order_count = (
+            SELECT COUNT(*) FROM orders
+            WHERE orders.table_id = restaurant_tables.id
+              AND orders.status IN ('pending', 'confirmed', 'ready')
+        )
+    """)
+    op.execute("UPDATE restaurant_tables SET is_occupied = TRUE WHERE open_order_count > 0")
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('restaurant_tables') as batch_op:
+        batch_op.drop_column('open_order_count')
@@ -0,0 +1,45 @@
+"""Never reuse order ids on SQLite
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '011'
+down_revision: Union[str, None] = '010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # В PostgreSQL id выдаёт последовательность, она и так не повторяется
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    with op.batch_alter_table('orders', recreate='always', table_kwargs={'sqlite_autoincrement': True}):
+        pass
+    # Счётчик не ниже id, уже ушедших в архив
+    op.execute("""
+        UPDATE sqlite_sequence SET seq = MAX(
+            seq,
+            COALESCE((SELECT MAX(id) FROM orders), 0),
+            COALESCE((SELECT MAX(id) FROM orders_archive), 0)
+        )
+        WHERE name = 'orders'
+    """)
+    op.execute("""
+        INSERT INTO sqlite_sequence (name, seq)
+        SELECT 'orders', MAX(COALESCE((SELECT MAX(id) FROM orders), 0), COALESCE((SELECT MAX(id) FROM orders_archive), 0))
+        WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = 'orders')
+    """)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    with op.batch_alter_table('orders', recreate='always', table_kwargs={'sqlite_autoincrement': False}):
+        pass
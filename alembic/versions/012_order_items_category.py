@@ -0,0 +1,36 @@
+"""Snapshot the dish category on order lines
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '012'
+down_revision: Union[str, None] = '011'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('order_items') as batch_op:
+        batch_op.add_column(sa.Column('category', sa.String(50), nullable=True))
+
+    # Для уже принятых заказов известна только текущая категория блюда;
+    # позиции удалённых блюд остаются без категории
+    op.execute("""
+        UPDATE order_items SET category = (
+            SELECT menu_items.category FROM menu_items
+            WHERE menu_items.id = order_items.menu_item_id
+        )
+    """)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('order_items') as batch_op:
+        batch_op.drop_column('category')
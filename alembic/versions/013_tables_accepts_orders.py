@@ -0,0 +1,27 @@
+"""Close tables to new orders while they are being deleted
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '013'
+down_revision: Union[str, None] = '012'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('restaurant_tables') as batch_op:
+        batch_op.add_column(sa.Column('accepts_orders', sa.Boolean(), nullable=False, server_default=sa.true()))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('restaurant_tables') as batch_op:
+        batch_op.drop_column('accepts_orders')
@@ -0,0 +1,69 @@
+from fastapi import APIRouter, BackgroundTasks, Depends, Query, status
+from typing import List, Optional
+from datetime import date
+from app.api.dependencies import DBDep, ReplicaDBDep, get_current_user_id, require_admin
+from app.schemes.analytics import (
+    AverageTicketResponse,
+    CategorySalesResponse,
+    DailySalesResponse,
+    DishSalesResponse,
+    HourlySalesResponse,
+)
+from app.schemes.jobs import PurgeJobResponse
+from app.utils.purge import purge_jobs
+from app.utils.sales_rollups import count_rollup_orders, rebuild_rollups
+
+# Все отчёты читают только предагрегированные таблицы sales_*,
+# таблица заказов в них не участвует
+router = APIRouter(prefix="/api/analytics", tags=["analytics"], dependencies=[Depends(get_current_user_id)])
+
+@router.get("/daily", response_model=List[DailySalesResponse])
+async def get_daily_sales(db: ReplicaDBDep, date_from: Optional[date] = None, date_to: Optional[date] = None):
+    """Get revenue and order counts per day"""
+    return await db.analytics.daily(date_from, date_to)
+
+@router.get("/hourly", response_model=List[HourlySalesResponse])
+async def get_hourly_sales(db: ReplicaDBDep, date_from: Optional[date] = None, date_to: Optional[date] = None):
+    """Get revenue and completed orders per hour of the day"""
+    return await db.analytics.hourly(date_from, date_to)
+
+@router.get("/categories", response_model=List[CategorySalesResponse])
+async def get_category_sales(db: ReplicaDBDep, date_from: Optional[date] = None, date_to: Optional[date] = None):
+    """Get sold quantity and revenue per menu category"""
+    return await db.analytics.categories(date_from, date_to)
+
+@router.get("/top-dishes", response_model=List[DishSalesResponse])
+async def get_top_dishes(
+    db: ReplicaDBDep,
+    limit: int = Query(10, ge=1, le=100),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+):
+    """Get the most sold dishes by quantity"""
+    return await db.analytics.top_dishes(limit, date_from, date_to)
+
+@router.get("/average-ticket", response_model=AverageTicketResponse)
+async def get_average_ticket(db: ReplicaDBDep, date_from: Optional[date] = None, date_to: Optional[date] = None):
+    """Get the average revenue per completed order"""
+    orders_completed, revenue = await db.analytics.completed_totals(date_from, date_to)
+    return AverageTicketResponse(
+        date_from=date_from,
+        date_to=date_to,
+        orders_completed=orders_completed,
+        revenue=revenue,
+        average_ticket=revenue / orders_completed if orders_completed else 0.0,
+    )
+
+def _rebuild_step(db, chunk_size: int) -> tuple[int, bool]:
+    # Пересчёт целиком в одной транзакции: частично пересчитанные сводки никто не увидит
+    return rebuild_rollups(db), True
+
+@router.post("/rebuild", status_code=status.HTTP_202_ACCEPTED, dependencies=[Depends(require_admin)])
+async def rebuild_sales(db: DBDep, background_tasks: BackgroundTasks):
+    """Start recomputing all rollups from live and archived orders (admin only)"""
+    total = await db.run_sync(count_rollup_orders)
+    await db.rollback()
+    job, created = purge_jobs.submit("sales_rollups", "all", total)
+    if created:
+        background_tasks.add_task(purge_jobs.run, job, _rebuild_step)
+    return {"message": "Analytics rebuild started", "job": PurgeJobResponse.model_validate(job)}
@@ -1,37 +1,73 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+import time
+
+from fastapi import APIRouter, HTTPException, Request, Response, status
+from app.api.dependencies import DBDep
 from app.schemes.user import LoginRequest, LoginResponse, UserResponse, UserCreate
-from app.models.user import User
-from app.database.core import get_db
-from passlib.context import CryptContext
+from app.config import settings
+from app.exceptions.auth import (
+    HashingOverloadedError,
+    HashingOverloadedHTTPError,
+    InvalidPasswordError,
+    UserAlreadyExistsError,
+    UserInactiveError,
+    UserNotFoundError,
+)
+from app.services.auth import AuthService
+from app.utils.auth_cache import claims_cache, token_deny_list, token_hash
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+def set_access_cookie(response: Response, access_token: str) -> None:
+    response.set_cookie(
+        "access_token",
+        access_token,
+        max_age=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        httponly=True,
+        samesite="lax",
+    )
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+async def refresh_access_cookie(request: Request, call_next):
+    """Middleware: re-issue the cookie once less than half of its lifetime is left.
+
+    Claims come from the cache filled by get_current_user_id during the
+    request, so only tokens the request was actually authorized with are
+    refreshed; revoked tokens (including the one just logged out) are not.
+    """
+    response = await call_next(request)
+    token = request.cookies.get("access_token")
+    if not token or response.status_code >= 400:
+        return response
+    key = token_hash(token)
+    claims = claims_cache.peek(key)
+    if claims and time.time() >= AuthService.refresh_at(claims) and not token_deny_list.is_revoked(key, claims):
+        set_access_cookie(response, AuthService.refresh_token(claims))
+    return response
+
+async def hash_password(password: str) -> str:
+    try:
+        return await AuthService.hash_password(password)
+    except HashingOverloadedError:
+        raise HashingOverloadedHTTPError
 
 @router.post("/login", response_model=LoginResponse)
-def login(credentials: LoginRequest, db: Session = Depends(get_db)):
-    """Login user and return user info"""
-    user = db.query(User).filter(User.username == credentials.username).first()
-    
-    if not user or not verify_password(credentials.password, user.password_hash):
+async def login(credentials: LoginRequest, response: Response, db: DBDep):
+    """Login user, set the access token cookie and return user info"""
+    try:
+        user, access_token = await AuthService(db).login_user(credentials)
+    except (UserNotFoundError, InvalidPasswordError):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Пароль неверный"
         )
-    
-    if not user.is_active:
+    except UserInactiveError:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Пользователь не найден"
         )
+    except HashingOverloadedError:
+        raise HashingOverloadedHTTPError
     
+    set_access_cookie(response, access_token)
     return LoginResponse(
         id=user.id,
         username=user.username,
@@ -40,15 +76,33 @@ def login(credentials: LoginRequest, db: Session = Depends(get_db)):
         message="Вход выполнен успешно!"
     )
 
+@router.post("/logout")
+async def logout(request: Request, response: Response):
+    """Revoke the current access token and clear the cookie"""
+    token = request.cookies.get("access_token")
+    if token:
+        try:
+            claims = AuthService.decode_token(token)
+        except Exception:
+            claims = None
+        # Истёкший или поддельный токен и так не пройдёт проверку
+        if claims:
+            key = token_hash(token)
+            token_deny_list.revoke_token(key, claims["exp"])
+            claims_cache.discard(key)
+    response.delete_cookie("access_token")
+    return {"message": "Logged out"}
+
 @router.post("/register", response_model=UserResponse)
-def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: DBDep):
     """Register new user (admin only in production)"""
-    existing_user = db.query(User).filter(User.username == user_data.username).first()
+    existing_user = await db.users.get_one_or_none(username=user_data.username)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Имя пользователя занято"
         )
+    await db.rollback()
     
     password = user_data.password
 
@@ -129,15 +183,12 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
             detail="Имя должно содержать не более 15 символов"
         )
         
-    new_user = User(
-        username=user_data.username,
-        password_hash=hash_password(user_data.password),
-        full_name=user_data.full_name,
-        role=user_data.role
-    )
-    
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
-    
-    return UserResponse.from_orm(new_user)
+    try:
+        return await AuthService(db).register_user(user_data)
+    except UserAlreadyExistsError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Имя пользователя занято"
+        )
+    except HashingOverloadedError:
+        raise HashingOverloadedHTTPError
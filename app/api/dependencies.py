@@ -3,14 +3,19 @@ from typing import Annotated
 from fastapi import Depends, Request
 from pydantic import BaseModel, Field
 
-from app.database.database import async_session_maker
+from app.database.database import async_session_maker, async_session_maker_read
 from app.exceptions.auth import (
+    AdminRequiredHTTPError,
     InvalidJWTTokenError,
     InvalidTokenHTTPError,
+    JWTTokenExpiredError,
+    JWTTokenExpiredHTTPError,
     NoAccessTokenHTTPError,
 )
 from app.services.auth import AuthService
 from app.database.db_manager import DBManager
+from app.utils.auth_cache import claims_cache, token_deny_list, token_hash
+from app.utils.read_replica import read_replica
 
 
 class PaginationParams(BaseModel):
@@ -21,27 +26,75 @@ class PaginationParams(BaseModel):
 PaginationDep = Annotated[PaginationParams, Depends()]
 
 
-def get_token(request: Request) -> str:
+async def get_token(request: Request) -> str:
     token = request.cookies.get("access_token", None)
     if token is None:
         raise NoAccessTokenHTTPError
     return token
 
 
-def get_current_user_id(token: str = Depends(get_token)) -> int:
-    try:
-        data = AuthService.decode_token(token)
-    except InvalidJWTTokenError:
+async def get_current_claims(token: str = Depends(get_token)) -> dict:
+    # async: зависимость выполняется в цикле событий, без перехода в пул потоков
+    key = token_hash(token)
+    data = claims_cache.get(key)
+    if data is None:
+        try:
+            data = AuthService.decode_token(token)
+        except InvalidJWTTokenError:
+            raise InvalidTokenHTTPError
+        except JWTTokenExpiredError:
+            raise JWTTokenExpiredHTTPError
+        claims_cache.put(key, data)
+    if token_deny_list.is_revoked(key, data):
         raise InvalidTokenHTTPError
-    return data["user_id"]
+    return data
+
+
+async def get_current_user_id(claims: dict = Depends(get_current_claims)) -> int:
+    return claims["user_id"]
+
+
+async def require_admin(claims: dict = Depends(get_current_claims)) -> None:
+    if claims.get("role") != "admin":
+        raise AdminRequiredHTTPError
 
 
 UserIdDep = Annotated[int, Depends(get_current_user_id)]
 
 
-async def get_db():
+def client_key(request: Request) -> str | None:
+    """Identifies a client session for read-your-writes routing"""
+    token = request.cookies.get("access_token")
+    return token_hash(token) if token else None
+
+
+async def track_write(request: Request):
+    """Keep the client's replica reads on the primary until its write is replicated"""
+    client = client_key(request)
+    read_replica.begin_write(client)
+    try:
+        yield
+    finally:
+        read_replica.end_write(client)
+
+
+async def get_db(_: None = Depends(track_write)):
     async with DBManager(session_factory=async_session_maker) as db:
         yield db
 
 
+async def get_read_db():
+    async with DBManager(session_factory=async_session_maker_read) as db:
+        yield db
+
+
+async def get_replica_db(request: Request):
+    async with DBManager(session_factory=read_replica.session_maker(client_key(request))) as db:
+        yield db
+
+
 DBDep = Annotated[DBManager, Depends(get_db)]
+# Только чтение: отдельный пул соединений, не занимающий соединение записи
+ReadDBDep = Annotated[DBManager, Depends(get_read_db)]
+# Отчёты и история: реплика, если она свежая и не отстаёт от записей клиента
+ReplicaDBDep = Annotated[DBManager, Depends(get_replica_db)]
@@ -1,82 +1,84 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException
 from typing import List
-from app.schemes.user import UserCreate, UserUpdate, UserResponse
+from app.schemes.user import UserAdd, UserCreate, UserPatch, UserUpdate, UserResponse
 from app.models.user import User
-from app.database.core import get_db
-from passlib.context import CryptContext
+from app.api.auth import hash_password
+from app.api.dependencies import DBDep, ReadDBDep, get_current_user_id
+from app.exceptions.base import ObjectAlreadyExistsError
+from app.utils.auth_cache import token_deny_list
 
-router = APIRouter(prefix="/api/employees", tags=["employees"])
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+router = APIRouter(prefix="/api/employees", tags=["employees"], dependencies=[Depends(get_current_user_id)])
 
 @router.get("/", response_model=List[UserResponse])
-def get_all_employees(db: Session = Depends(get_db)):
+async def get_all_employees(db: ReadDBDep):
     """Get all employees (only staff, exclude regular users)"""
-    employees = db.query(User).filter(User.role != 'user').all()
-    return employees
+    return await db.users.get_all(None, None, User.role != 'user')
 
 @router.get("/role/{role}", response_model=List[UserResponse])
-def get_employees_by_role(role: str, db: Session = Depends(get_db)):
+async def get_employees_by_role(role: str, db: ReadDBDep):
     """Get employees by role"""
-    employees = db.query(User).filter(User.role == role).all()
-    return employees
+    return await db.users.get_all(role=role)
 
 @router.get("/{employee_id}", response_model=UserResponse)
-def get_employee(employee_id: int, db: Session = Depends(get_db)):
+async def get_employee(employee_id: int, db: ReadDBDep):
     """Get specific employee"""
-    employee = db.query(User).filter(User.id == employee_id).first()
+    employee = await db.users.get_one_or_none(id=employee_id)
     if not employee:
         raise HTTPException(status_code=404, detail="Employee not found")
     return employee
 
 @router.post("/", response_model=UserResponse)
-def create_employee(employee_data: UserCreate, db: Session = Depends(get_db)):
+async def create_employee(employee_data: UserCreate, db: DBDep):
     """Create new employee (admin only)"""
-    existing = db.query(User).filter(User.username == employee_data.username).first()
+    existing = await db.users.get_one_or_none(username=employee_data.username)
     if existing:
         raise HTTPException(status_code=400, detail="Username already exists")
+    # Соединение записи не должно простаивать, пока bcrypt считает хэш
+    await db.rollback()
     
-    new_employee = User(
-        username=employee_data.username,
-        password_hash=hash_password(employee_data.password),
-        full_name=employee_data.full_name,
-        role=employee_data.role
-    )
-    
-    db.add(new_employee)
-    db.commit()
-    db.refresh(new_employee)
+    try:
+        new_employee = await db.users.add(UserAdd(
+            username=employee_data.username,
+            password_hash=await hash_password(employee_data.password),
+            full_name=employee_data.full_name,
+            role=employee_data.role
+        ))
+    except ObjectAlreadyExistsError:
+        raise HTTPException(status_code=400, detail="Username already exists")
+    await db.commit()
     return new_employee
 
 @router.put("/{employee_id}", response_model=UserResponse)
-def update_employee(employee_id: int, employee_data: UserUpdate, db: Session = Depends(get_db)):
+async def update_employee(employee_id: int, employee_data: UserUpdate, db: DBDep):
     """Update employee"""
-    employee = db.query(User).filter(User.id == employee_id).first()
+    employee = await db.users.get_one_or_none(id=employee_id)
     if not employee:
         raise HTTPException(status_code=404, detail="Employee not found")
     
+    patch = UserPatch()
     if employee_data.full_name:
-        employee.full_name = employee_data.full_name
+        patch.full_name = employee_data.full_name
     if employee_data.password:
-        employee.password_hash = hash_password(employee_data.password)
+        await db.rollback()
+        patch.password_hash = await hash_password(employee_data.password)
     if employee_data.is_active is not None:
-        employee.is_active = employee_data.is_active
+        patch.is_active = employee_data.is_active
     
-    db.commit()
-    db.refresh(employee)
-    return employee
+    if patch.model_fields_set:
+        await db.users.edit(patch, exclude_unset=True, id=employee_id)
+        await db.commit()
+    # Уже выданные токены перестают действовать после смены пароля или блокировки
+    if employee_data.password or employee_data.is_active is False:
+        token_deny_list.revoke_user(employee_id)
+    return await db.users.get_one_or_none(id=employee_id)
 
 @router.delete("/{employee_id}")
-def delete_employee(employee_id: int, db: Session = Depends(get_db)):
+async def delete_employee(employee_id: int, db: DBDep):
     """Delete employee"""
-    employee = db.query(User).filter(User.id == employee_id).first()
+    employee = await db.users.get_one_or_none(id=employee_id)
     if not employee:
         raise HTTPException(status_code=404, detail="Employee not found")
     
-    db.delete(employee)
-    db.commit()
+    await db.users.delete(id=employee_id)
+    token_deny_list.revoke_user(employee_id)
     return {"message": "Employee deleted successfully"}
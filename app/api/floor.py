@@ -0,0 +1,15 @@
+from fastapi import APIRouter, Depends, Request, Response
+from typing import List
+from app.api.dependencies import ReadDBDep, get_current_user_id
+from app.schemes.floor import FloorTableResponse
+from app.utils.changes import entity_etag, not_modified
+
+router = APIRouter(prefix="/api/floor", tags=["floor"], dependencies=[Depends(get_current_user_id)])
+
+@router.get("", response_model=List[FloorTableResponse])
+async def get_floor(request: Request, response: Response, db: ReadDBDep):
+    """Get every table with its open orders summary in one query"""
+    cached = not_modified(request, response, await db.run_sync(entity_etag, "tables", "orders"))
+    if cached:
+        return cached
+    return await db.tables.get_floor()
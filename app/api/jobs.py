@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Depends, HTTPException
+from typing import List
+from app.api.dependencies import get_current_user_id
+from app.schemes.jobs import PurgeJobResponse
+from app.utils.purge import purge_jobs
+
+router = APIRouter(prefix="/api/jobs", tags=["jobs"], dependencies=[Depends(get_current_user_id)])
+
+@router.get("/", response_model=List[PurgeJobResponse])
+def get_jobs():
+    """Get recent background jobs, newest first"""
+    return purge_jobs.list()
+
+@router.get("/{job_id}", response_model=PurgeJobResponse)
+def get_job(job_id: str):
+    """Get background job progress"""
+    job = purge_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
@@ -1,64 +1,164 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
-from app.schemes.menu import MenuItemCreate, MenuItemUpdate, MenuItemResponse
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from typing import List, Literal, Optional
+from app.schemes.changes import ChangesResponse
+from app.schemes.jobs import PurgeJobResponse
+from app.api.dependencies import DBDep, ReadDBDep, get_current_user_id
+from app.schemes.menu import MenuImportResponse, MenuItemCreate, MenuItemUpdate, MenuItemResponse, MenuSearchResponse
 from app.models.menu import MenuItem
-from app.database.core import get_db
+from app.config import settings
+from app.exceptions.base import ObjectAlreadyExistsError
+from app.database.database import async_session_maker_read
+from app.database.db_manager import DBManager
+from app.services.menu import MenuService
+from app.utils.changes import entity_etag, get_changes, not_modified
+from app.utils.menu_cache import menu_snapshot
+from app.utils.menu_io import MEDIA_TYPES, parse_rows
+from app.utils.menu_search import search_menu
+from app.utils.purge import count_category_rows, purge_category_step, purge_jobs, run_purge
 
-router = APIRouter(prefix="/api/menu", tags=["menu"])
+router = APIRouter(prefix="/api/menu", tags=["menu"], dependencies=[Depends(get_current_user_id)])
+
+def _accepts_gzip(request: Request) -> bool:
+    for coding in request.headers.get("accept-encoding", "").split(","):
+        name, _, params = coding.strip().partition(";")
+        if name.strip().lower() in ("gzip", "*"):
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
 
 @router.get("/", response_model=List[MenuItemResponse])
-def get_all_menu_items(db: Session = Depends(get_db)):
-    """Get all menu items"""
-    items = db.query(MenuItem).all()
-    return items
+async def get_all_menu_items(request: Request, db: ReadDBDep):
+    """Get all menu items from the pre-encoded snapshot"""
+    menu = await db.run_sync(menu_snapshot.encoded)
+    headers = {"Vary": "Accept-Encoding"}
+    body, etag = menu.body, menu.etag
+    if _accepts_gzip(request):
+        # У сжатого представления свой строгий ETag
+        body, etag = menu.gzip_body, menu.etag[:-1] + '-gzip"'
+        headers["Content-Encoding"] = "gzip"
+
+    response = Response(content=body, media_type="application/json", headers=headers)
+    cached = not_modified(request, response, etag)
+    if cached:
+        cached.headers["Vary"] = "Accept-Encoding"
+        return cached
+    return response
+
+@router.get("/changes", response_model=ChangesResponse[MenuItemResponse])
+async def get_menu_changes(request: Request, response: Response, db: ReadDBDep, since: Optional[int] = None):
+    """Get menu items changed after the cursor, with tombstones for deleted ones"""
+    cached = not_modified(request, response, await db.run_sync(entity_etag, "menu"))
+    if cached:
+        return cached
+    return await db.run_sync(get_changes, MenuItem, since)
+
+@router.get("/search", response_model=MenuSearchResponse)
+async def search_menu_items(
+    db: ReadDBDep,
+    q: str = "",
+    category: Optional[str] = None,
+    available: Optional[bool] = None,
+    limit: int = Query(50, ge=1, le=200),
+):
+    """Full-text prefix search over names and descriptions with category counts"""
+    return await db.run_sync(search_menu, q, category, available, limit)
+
+@router.post("/import", response_model=MenuImportResponse)
+async def import_menu(request: Request, db: DBDep, format: Optional[Literal["csv", "ndjson"]] = None):
+    """Import menu items from a CSV or NDJSON request body, updating items with the same name and category"""
+    if format is None:
+        format = "csv" if "csv" in request.headers.get("content-type", "") else "ndjson"
+    return await MenuService(db).import_items(parse_rows(request.stream(), format))
+
+@router.get("/export")
+async def export_menu(format: Literal["csv", "ndjson"] = "csv"):
+    """Stream all menu items as CSV or NDJSON"""
+    async def chunks():
+        # Своя сессия: зависимость закрылась бы раньше, чем закончится поток
+        async with DBManager(session_factory=async_session_maker_read) as db:
+            async for chunk in MenuService(db).export_items(format):
+                yield chunk
+
+    return StreamingResponse(
+        chunks(),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="menu.{format}"'},
+    )
 
 @router.get("/{item_id}", response_model=MenuItemResponse)
-def get_menu_item(item_id: int, db: Session = Depends(get_db)):
+async def get_menu_item(item_id: int, db: ReadDBDep):
     """Get specific menu item"""
-    item = db.query(MenuItem).filter(MenuItem.id == item_id).first()
+    item = await db.menu.get_one_or_none(id=item_id)
     if not item:
         raise HTTPException(status_code=404, detail="Menu item not found")
     return item
 
 @router.post("/", response_model=MenuItemResponse)
-def create_menu_item(item_data: MenuItemCreate, db: Session = Depends(get_db)):
+async def create_menu_item(item_data: MenuItemCreate, db: DBDep):
     """Create new menu item"""
-    new_item = MenuItem(**item_data.dict())
-    db.add(new_item)
-    db.commit()
-    db.refresh(new_item)
+    try:
+        new_item = await db.menu.add(item_data)
+    except ObjectAlreadyExistsError:
+        raise HTTPException(status_code=400, detail="Menu item with this name already exists in this category")
+    await db.commit()
+    menu_snapshot.invalidate()
     return new_item
 
 @router.put("/{item_id}", response_model=MenuItemResponse)
-def update_menu_item(item_id: int, item_data: MenuItemUpdate, db: Session = Depends(get_db)):
+async def update_menu_item(item_id: int, item_data: MenuItemUpdate, db: DBDep):
     """Update menu item"""
-    item = db.query(MenuItem).filter(MenuItem.id == item_id).first()
+    item = await db.menu.get_one_or_none(id=item_id)
     if not item:
         raise HTTPException(status_code=404, detail="Menu item not found")
     
-    update_data = item_data.dict(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(item, key, value)
-    
-    db.commit()
-    db.refresh(item)
-    return item
+    if item_data.model_fields_set:
+        try:
+            await db.menu.edit(item_data, exclude_unset=True, id=item_id)
+        except ObjectAlreadyExistsError:
+            raise HTTPException(status_code=400, detail="Menu item with this name already exists in this category")
+        await db.commit()
+        menu_snapshot.invalidate()
+    return await db.menu.get_one_or_none(id=item_id)
 
 @router.delete("/{item_id}")
-def delete_menu_item(item_id: int, db: Session = Depends(get_db)):
-    """Delete menu item (can delete anytime - items are stored as JSON in orders)"""
+async def delete_menu_item(item_id: int, db: DBDep):
+    """Delete menu item (can delete anytime - order lines keep a snapshot of name and price)"""
+    item = await db.menu.get_one_or_none(id=item_id)
+    if not item:
+        raise HTTPException(status_code=404, detail="Menu item not found")
+
     try:
-        item = db.query(MenuItem).filter(MenuItem.id == item_id).first()
-        if not item:
-            raise HTTPException(status_code=404, detail="Menu item not found")
-        
-        item_name = item.name
-        db.delete(item)
-        db.commit()
-        
-        return {"message": f"Menu item '{item_name}' deleted successfully"}
+        await db.menu.delete(id=item_id)
     except Exception as e:
-        db.rollback()
         print(f"Error deleting menu item: {str(e)}")
         raise HTTPException(status_code=400, detail=f"Error deleting menu item: {str(e)}")
+    menu_snapshot.invalidate()
+    return {"message": f"Menu item '{item.name}' deleted successfully"}
+
+@router.delete("/category/{category}")
+async def delete_menu_category(
+    category: str,
+    response: Response,
+    background_tasks: BackgroundTasks,
+    db: DBDep,
+):
+    """Delete every menu item in a category, in the background if there are many"""
+    total = await db.run_sync(count_category_rows, category)
+    if not total:
+        raise HTTPException(status_code=404, detail="Category not found")
+
+    if total > settings.PURGE_CHUNK_SIZE:
+        # Фоновая задача стартует до закрытия сессии запроса, а соединение записи одно
+        await db.rollback()
+        job, created = purge_jobs.submit("menu_category", category, total)
+        if created:
+            background_tasks.add_task(purge_jobs.run, job, purge_category_step(category))
+        response.status_code = status.HTTP_202_ACCEPTED
+        return {"message": "Category deletion started", "job": PurgeJobResponse.model_validate(job)}
+
+    try:
+        deleted = await db.run_sync(run_purge, purge_category_step(category))
+    except Exception as e:
+        print(f"Error deleting menu category: {str(e)}")
+        raise HTTPException(status_code=400, detail=f"Error deleting menu category: {str(e)}")
+    return {"message": f"Category '{category}' deleted successfully (deleted {deleted} menu items)"}
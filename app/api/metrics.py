@@ -0,0 +1,53 @@
+from fastapi import APIRouter, Depends
+from typing import List
+from app.api.dependencies import get_current_user_id
+from app.database.database import engine, read_engine, replica_engine
+from app.schemes.metrics import (
+    AuthCacheMetricsResponse,
+    HashingMetricsResponse,
+    OrderWriterMetricsResponse,
+    PoolMetricsResponse,
+    ReplicaMetricsResponse,
+)
+from app.utils.auth_cache import claims_cache, token_deny_list
+from app.utils.order_writer import order_writer
+from app.utils.password_hashing import password_hasher
+from app.utils.read_replica import read_replica
+
+router = APIRouter(prefix="/api/metrics", tags=["metrics"], dependencies=[Depends(get_current_user_id)])
+
+@router.get("/hashing", response_model=HashingMetricsResponse)
+def get_hashing_metrics():
+    """Password hashing pool load, wait time in the pool queue and bcrypt time"""
+    return password_hasher.metrics()
+
+@router.get("/auth", response_model=AuthCacheMetricsResponse)
+def get_auth_metrics():
+    """Verified-claims cache efficiency and deny-list size"""
+    return {
+        "cached_tokens": len(claims_cache),
+        "hits": claims_cache.hits,
+        "misses": claims_cache.misses,
+        "denied_entries": len(token_deny_list),
+    }
+
+@router.get("/writes", response_model=OrderWriterMetricsResponse)
+def get_order_write_metrics():
+    """Group commit of order writes: batch sizes, queue wait and transaction time"""
+    return order_writer.metrics()
+
+@router.get("/pool", response_model=List[PoolMetricsResponse])
+def get_pool_metrics():
+    """Database connection pools: connections in use and checkout wait time"""
+    pools = {"writer": engine} if read_engine is engine else {"writer": engine, "reader": read_engine}
+    if replica_engine is not None:
+        pools["replica"] = replica_engine
+    return [
+        {"name": name, "dialect": pool_engine.dialect.name, **pool_engine.pool.metrics()}
+        for name, pool_engine in pools.items()
+    ]
+
+@router.get("/replica", response_model=ReplicaMetricsResponse)
+def get_replica_metrics():
+    """Read replica lag and how report reads were routed"""
+    return read_replica.metrics()
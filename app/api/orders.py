@@ -1,102 +1,396 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
+import json
+import time
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import case, select, update
 from sqlalchemy.orm import Session
-from typing import List
-from app.schemes.order import OrderCreate, OrderUpdate, OrderResponse
-from app.models.order import Order
-from app.models.menu import MenuItem
+from typing import List, Optional
+from app.api.dependencies import DBDep, ReadDBDep, ReplicaDBDep, get_current_user_id, track_write
+from app.schemes.changes import ChangesResponse
+from app.schemes.order import (
+    CLOSED_STATUSES,
+    ORDER_STATUSES,
+    BulkStatusResponse,
+    BulkStatusUpdate,
+    OrderCreate,
+    OrderResponse,
+    OrderStatusResult,
+    OrderUpdate,
+    order_payload,
+    source_statuses,
+)
+from app.schemes.pagination import Page
+from app.models.order import Order, OrderItem
 from app.models.table import RestaurantTable
-from app.database.core import get_db
+from app.config import settings
+from app.database.database import async_session_maker_read
+from app.database.db_manager import DBManager
+from app.services.auth import AuthService
+from app.utils.active_orders import active_orders
+from app.utils.auth_cache import claims_cache, token_hash
+from app.utils.changes import entity_etag, get_changes, not_modified, record_changes
+from app.utils.menu_cache import menu_snapshot
+from app.utils.occupancy import adjust_open_orders
+from app.utils.order_archive import archive_orders, export_orders_ndjson
+from app.utils.order_events import order_events
+from app.utils.order_writer import one_by_one, order_writer
+from app.utils.sales_rollups import record_status_change, record_status_changes
 
-router = APIRouter(prefix="/api/orders", tags=["orders"])
+router = APIRouter(prefix="/api/orders", tags=["orders"], dependencies=[Depends(get_current_user_id)])
 
-@router.get("/", response_model=List[OrderResponse])
-def get_all_orders(db: Session = Depends(get_db)):
-    """Get all orders"""
-    orders = db.query(Order).all()
-    return orders
+STREAM_KEEPALIVE_SECONDS = 15
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
 
-@router.get("/status/{status}", response_model=List[OrderResponse])
-def get_orders_by_status(status: str, db: Session = Depends(get_db)):
-    """Get orders by status"""
-    orders = db.query(Order).filter(Order.status == status).all()
-    return orders
+
+def _format_sse(seq: int, event_type: str, data) -> str:
+    return (
+        f"id: {order_events.event_id(seq)}\n"
+        f"event: {event_type}\n"
+        f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+    )
+
+@router.get("/", response_model=Page[OrderResponse])
+async def get_all_orders(
+    request: Request,
+    response: Response,
+    db: ReplicaDBDep,
+    after_id: Optional[int] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+):
+    """Get orders page by page, newest first"""
+    cached = not_modified(request, response, await db.run_sync(entity_etag, "orders"))
+    if cached:
+        return cached
+    orders, next_id = await db.orders.get_recent_page(limit=limit, after_id=after_id)
+    return {"items": orders, "next": next_id}
+
+@router.get("/changes", response_model=ChangesResponse[OrderResponse])
+async def get_order_changes(request: Request, response: Response, db: ReadDBDep, since: Optional[int] = None):
+    """Get orders changed after the cursor, with tombstones for deleted ones"""
+    cached = not_modified(request, response, await db.run_sync(entity_etag, "orders"))
+    if cached:
+        return cached
+    return await db.run_sync(get_changes, Order, since)
+
+@router.get("/status/{status}", response_model=Page[OrderResponse])
+async def get_orders_by_status(
+    status: str,
+    request: Request,
+    response: Response,
+    db: ReplicaDBDep,
+    after_id: Optional[int] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+):
+    """Get orders by status page by page, newest first"""
+    cached = not_modified(request, response, await db.run_sync(entity_etag, "orders"))
+    if cached:
+        return cached
+    orders, next_id = await db.orders.get_recent_page(Order.status == status, limit=limit, after_id=after_id)
+    return {"items": orders, "next": next_id}
+
+@router.get("/active", response_model=List[OrderResponse])
+async def get_active_orders(request: Request, response: Response, db: ReadDBDep):
+    """Get orders in pending, confirmed and ready statuses from the read model"""
+    cached = not_modified(request, response, await db.run_sync(entity_etag, "orders"))
+    if cached:
+        return cached
+    return await db.run_sync(active_orders.snapshot)
+
+@router.get("/stream")
+async def stream_orders(request: Request, last_event_id: Optional[str] = Header(default=None)):
+    """Server-Sent Events feed of committed order changes.
+
+    A new client first receives a one-time snapshot of active orders; a
+    reconnecting client sends Last-Event-ID and only gets the events it missed.
+    The stream ends once the cookie is due for renewal, so the browser
+    reconnects and gets a fresh cookie before the old one expires.
+    """
+    claims = claims_cache.peek(token_hash(request.cookies["access_token"]))
+    renew_at = AuthService.refresh_at(claims) if claims else time.time()
+    if renew_at <= time.time():
+        # Этот ответ уже продлевает cookie
+        renew_at = time.time() + settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60 / 2
+    subscription, start_seq, backlog = order_events.subscribe(
+        order_events.parse_event_id(last_event_id)
+    )
+
+    async def event_stream():
+        try:
+            yield "retry: 3000\n\n"
+            if backlog is None:
+                async with DBManager(session_factory=async_session_maker_read) as db:
+                    snapshot = await db.run_sync(active_orders.snapshot)
+                yield _format_sse(start_seq, "snapshot", snapshot)
+            else:
+                for event in backlog:
+                    yield _format_sse(event.seq, event.type, event.data)
+
+            while not subscription.overflowed and time.time() < renew_at:
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), STREAM_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keepalive\n\n"
+                    continue
+                yield _format_sse(event.seq, event.type, event.data)
+        finally:
+            order_events.unsubscribe(subscription)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/export")
+async def export_orders(include_archived: bool = True):
+    """Stream live and archived orders as NDJSON"""
+    return StreamingResponse(
+        export_orders_ndjson(include_archived),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="orders.ndjson"'},
+    )
+
+@router.post("/archive", dependencies=[Depends(track_write)])
+async def archive_closed_orders(older_than_days: Optional[int] = Query(None, ge=0)):
+    """Move old completed and cancelled orders into the archive now"""
+    archived = await archive_orders(older_than_days)
+    return {"message": "Orders archived successfully", "archived": archived}
 
 @router.get("/{order_id}", response_model=OrderResponse)
-def get_order(order_id: int, db: Session = Depends(get_db)):
+async def get_order(order_id: int, db: ReadDBDep):
     """Get specific order"""
-    order = db.query(Order).filter(Order.id == order_id).first()
+    order = await db.orders.get_one_or_none(id=order_id)
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
     return order
 
-@router.post("/", response_model=OrderResponse)
-def create_order(order_data: OrderCreate, db: Session = Depends(get_db)):
-    """Create new order"""
-    table = db.query(RestaurantTable).filter(RestaurantTable.id == order_data.table_id).first()
-    if not table:
-        raise HTTPException(status_code=404, detail="Table not found")
-    
-    total_price = 0
-    items_data = []
-    for item in order_data.items:
-        menu_item = db.query(MenuItem).filter(MenuItem.id == item.menu_item_id).first()
-        if not menu_item:
-            raise HTTPException(status_code=404, detail=f"Menu item {item.menu_item_id} not found")
-        total_price += menu_item.price * item.quantity
-        items_data.append({
-            "menu_item_id": item.menu_item_id,
-            "name": menu_item.name,
-            "quantity": item.quantity,
-            "price": menu_item.price
-        })
-    
-    new_order = Order(
-        table_id=order_data.table_id,
-        items=items_data,
-        total_price=total_price,
-        status="pending"
-    )
-    
-    table.is_occupied = True
-    db.add(new_order)
-    db.commit()
-    db.refresh(new_order)
-    return new_order
-
-@router.put("/{order_id}", response_model=OrderResponse)
-def update_order(order_id: int, order_data: OrderUpdate, db: Session = Depends(get_db)):
-    """Update order"""
-    order = db.query(Order).filter(Order.id == order_id).first()
-    if not order:
+def _create_orders(db: Session, writes: list[tuple[OrderCreate]]) -> list:
+    """Insert the orders of a write batch with set-based statements"""
+    requested = [order_data for (order_data,) in writes]
+    # FOR KEY SHARE до конца транзакции: удаление стола дождётся этих заказов
+    tables = dict(db.execute(
+        select(RestaurantTable.id, RestaurantTable.accepts_orders)
+        .where(RestaurantTable.id.in_({order_data.table_id for order_data in requested}))
+        .with_for_update(read=True, key_share=True)
+    ).all())
+    menu = menu_snapshot.get_many(db, (item.menu_item_id for order_data in requested for item in order_data.items))
+
+    # Проверки идут до первой записи, поэтому отклонённый заказ ничего не оставляет в транзакции
+    outcomes = [None] * len(requested)
+    new_orders = {}
+    for index, order_data in enumerate(requested):
+        if order_data.table_id not in tables:
+            outcomes[index] = HTTPException(status_code=404, detail="Table not found")
+            continue
+        if not tables[order_data.table_id]:
+            outcomes[index] = HTTPException(status_code=409, detail="Table is being deleted")
+            continue
+        missing = next((item.menu_item_id for item in order_data.items if item.menu_item_id not in menu), None)
+        if missing is not None:
+            outcomes[index] = HTTPException(status_code=404, detail=f"Menu item {missing} not found")
+            continue
+
+        total_price = 0
+        order_items = []
+        for item in order_data.items:
+            menu_item = menu[item.menu_item_id]
+            total_price += menu_item.price * item.quantity
+            order_items.append(OrderItem(
+                menu_item_id=item.menu_item_id,
+                name=menu_item.name,
+                quantity=item.quantity,
+                price=menu_item.price,
+                category=menu_item.category,
+            ))
+        new_orders[index] = Order(
+            table_id=order_data.table_id,
+            items=order_items,
+            total_price=total_price,
+            status="pending"
+        )
+
+    if new_orders:
+        # Один INSERT на все заказы и один на все позиции; created_at
+        # возвращается тем же INSERT ... RETURNING
+        db.add_all(new_orders.values())
+        adjust_open_orders(db, (order.table_id for order in new_orders.values()), 1)
+        db.flush()
+        for index, order in new_orders.items():
+            payload = order_payload(order)
+            outcomes[index] = (payload, [("created", payload)])
+    return outcomes
+
+@router.post("/", response_model=OrderResponse, dependencies=[Depends(track_write)])
+async def create_order(order_data: OrderCreate):
+    """Create new order; it is committed together with other writes of the same few milliseconds"""
+    return await order_writer.submit(_create_orders, order_data)
+
+def _status_conflict(db: Session, order_id: int, new_status: str, version: Optional[int] = None):
+    """Explain why a conditional status UPDATE matched no row"""
+    row = db.query(Order.status, Order.version).filter(Order.id == order_id).first()
+    if row is None:
         raise HTTPException(status_code=404, detail="Order not found")
-    
-    if order_data.status:
-        order.status = order_data.status
-        if order_data.status == "completed" or order_data.status == "cancelled":
-            table = db.query(RestaurantTable).filter(RestaurantTable.id == order.table_id).first()
-            if table:
-                table.is_occupied = False
-    
-    db.commit()
-    db.refresh(order)
-    return order
+    # Заказ уже в нужном статусе или версия разошлась: его успел изменить другой запрос
+    stale = row.status == new_status or (version is not None and version != row.version)
+    if not stale and row.status not in source_statuses(new_status):
+        message = f"Cannot change status from {row.status} to {new_status}"
+    else:
+        message = "Order was modified by another request"
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail={"message": message, "status": row.status, "version": row.version},
+    )
 
-@router.delete("/{order_id}")
-def delete_order(order_id: int, db: Session = Depends(get_db)):
-    """Delete order"""
+@one_by_one
+def _bulk_update_status(db: Session, data: BulkStatusUpdate) -> tuple[BulkStatusResponse, list]:
+    results = {}
+    requested = {}
+    for change in data.orders:
+        if change.order_id in results or change.order_id in requested:
+            results[change.order_id] = OrderStatusResult(
+                order_id=change.order_id, result="invalid", detail="Duplicate order id"
+            )
+            requested.pop(change.order_id, None)
+        elif change.status not in ORDER_STATUSES:
+            results[change.order_id] = OrderStatusResult(
+                order_id=change.order_id, result="invalid", detail=f"Unknown status {change.status}"
+            )
+        else:
+            requested[change.order_id] = change
+
+    current = {
+        row.id: row
+        for row in db.query(Order.id, Order.status, Order.version).filter(Order.id.in_(requested))
+    }
+    changes = {}
+    for order_id, change in requested.items():
+        row = current.get(order_id)
+        if row is None:
+            results[order_id] = OrderStatusResult(order_id=order_id, result="not_found", detail="Order not found")
+        elif row.status == change.status:
+            results[order_id] = OrderStatusResult(order_id=order_id, result="unchanged", status=row.status)
+        elif change.version is not None and change.version != row.version:
+            results[order_id] = OrderStatusResult(
+                order_id=order_id, result="conflict", status=row.status,
+                detail="Order was modified by another request",
+            )
+        elif row.status not in source_statuses(change.status):
+            results[order_id] = OrderStatusResult(
+                order_id=order_id, result="invalid", status=row.status,
+                detail=f"Cannot change status from {row.status} to {change.status}",
+            )
+        else:
+            changes[order_id] = change.status
+
+    updated = []
+    events = []
+    if changes:
+        # Версия, прочитанная выше, служит условием UPDATE: строки,
+        # изменённые другим запросом после чтения, не обновятся
+        rows = db.execute(
+            update(Order)
+            .where(
+                Order.id.in_(changes),
+                Order.version == case({order_id: current[order_id].version for order_id in changes}, value=Order.id),
+            )
+            .values(status=case(changes, value=Order.id), version=Order.version + 1)
+            .returning(Order.id, Order.table_id),
+            execution_options={"synchronize_session": False},
+        ).all()
+        updated = [row.id for row in rows]
+        record_changes(db, "orders", updated)
+        adjust_open_orders(db, (row.table_id for row in rows if changes[row.id] in CLOSED_STATUSES), -1)
+
+        closing = [order_id for order_id in updated if changes[order_id] in CLOSED_STATUSES]
+        if closing:
+            orders = db.query(Order).filter(Order.id.in_(closing)).all()
+            record_status_changes(db, [(order, current[order.id].status, changes[order.id]) for order in orders])
+
+        for order_id in changes.keys() - set(updated):
+            results[order_id] = OrderStatusResult(
+                order_id=order_id, result="conflict", detail="Order was modified by another request"
+            )
+        for order_id in updated:
+            results[order_id] = OrderStatusResult(order_id=order_id, result="updated", status=changes[order_id])
+
+        for order in db.query(Order).filter(Order.id.in_(updated)).populate_existing():
+            events.append(("updated", order_payload(order)))
+
+    order_ids = dict.fromkeys(change.order_id for change in data.orders)
+    response = BulkStatusResponse(updated=len(updated), results=[results[order_id] for order_id in order_ids])
+    return response, events
+
+@router.patch("/bulk", response_model=BulkStatusResponse, dependencies=[Depends(track_write)])
+async def bulk_update_status(data: BulkStatusUpdate):
+    """Change the status of many orders in one transaction"""
+    return await order_writer.submit(_bulk_update_status, data)
+
+@one_by_one
+def _update_order_status(db: Session, order_id: int, order_data: OrderUpdate) -> tuple[dict, list]:
+    # Переход разрешён, только если текущий статус допускает его;
+    # с version заказ не должен был меняться с момента чтения клиентом
+    stmt = (
+        update(Order)
+        .where(Order.id == order_id, Order.status.in_(source_statuses(order_data.status)))
+        .values(status=order_data.status, version=Order.version + 1)
+        .returning(Order.table_id)
+    )
+    if order_data.version is not None:
+        stmt = stmt.where(Order.version == order_data.version)
+    table_id = db.execute(stmt, execution_options={"synchronize_session": False}).scalar()
+    if table_id is None:
+        _status_conflict(db, order_id, order_data.status, order_data.version)
+
+    record_changes(db, "orders", [order_id])
+    order = db.query(Order).filter(Order.id == order_id).one()
+    if order_data.status in CLOSED_STATUSES:
+        adjust_open_orders(db, [table_id], -1)
+        # Закрытые статусы конечные, поэтому раньше заказ в агрегатах не учитывался
+        record_status_change(db, order, None, order_data.status)
+
+    payload = order_payload(order)
+    return payload, [("updated", payload)]
+
+@router.put("/{order_id}", response_model=OrderResponse, dependencies=[Depends(track_write)])
+async def update_order(order_id: int, order_data: OrderUpdate, db: ReadDBDep):
+    """Update order status with a single conditional UPDATE"""
+    if not order_data.status:
+        order = await db.orders.get_one_or_none(id=order_id)
+        if not order:
+            raise HTTPException(status_code=404, detail="Order not found")
+        return order
+
+    if order_data.status not in ORDER_STATUSES:
+        raise HTTPException(status_code=400, detail=f"Unknown status {order_data.status}")
+
+    return await order_writer.submit(_update_order_status, order_id, order_data)
+
+def _delete_order(db: Session, order_id: int) -> dict:
     try:
         order = db.query(Order).filter(Order.id == order_id).first()
         if not order:
             raise HTTPException(status_code=404, detail="Order not found")
         
-        table = db.query(RestaurantTable).filter(RestaurantTable.id == order.table_id).first()
-        if table:
-            table.is_occupied = False
+        if order.status not in CLOSED_STATUSES:
+            adjust_open_orders(db, [order.table_id], -1)
         
+        # Удалённый заказ больше не учитывается в аналитике
+        record_status_change(db, order, order.status, None)
         db.delete(order)
         db.commit()
+        active_orders.remove(order_id)
+        order_events.publish("deleted", {"id": order_id})
         return {"message": "Order deleted successfully"}
     except Exception as e:
         db.rollback()
         print(f"Error deleting order: {str(e)}")
         raise HTTPException(status_code=400, detail=f"Error deleting order: {str(e)}")
+
+@router.delete("/{order_id}")
+async def delete_order(order_id: int, db: DBDep):
+    """Delete order"""
+    return await db.run_sync(_delete_order, order_id)
@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.api.dependencies import DBDep
+from app.api.dependencies import DBDep, ReadDBDep
 from app.exceptions.roles import (
     RoleAlreadyExistsError,
     RoleAlreadyExistsHTTPError,
@@ -8,7 +8,6 @@ from app.exceptions.roles import (
     RoleNotFoundHTTPError,
 )
 from app.schemes.roles import SRoleAdd, SRoleGet
-from app.schemes.relations_users_roles import SRoleGetWithRels
 from app.services.roles import RoleService
 
 router = APIRouter(prefix="/auth", tags=["Управление ролями"])
@@ -28,16 +27,16 @@ async def create_new_role(
 
 @router.get("/roles", summary="Получение списка ролей")
 async def get_all_roles(
-    db: DBDep,
+    db: ReadDBDep,
 ) -> list[SRoleGet]:
     return await RoleService(db).get_roles()
 
 
 @router.get("/roles/{id}", summary="Получение конкретной роли")
 async def get_role(
-    db: DBDep,
+    db: ReadDBDep,
     id: int,
-) -> SRoleGetWithRels:
+) -> SRoleGet:
     return await RoleService(db).get_role(role_id=id)
 
 
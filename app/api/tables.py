@@ -1,74 +1,107 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
-from app.schemes.table import TableCreate, TableUpdate, TableResponse
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, Response, status
+from typing import List, Optional
+from app.api.dependencies import DBDep, ReadDBDep, get_current_user_id
+from app.schemes.changes import ChangesResponse
+from app.schemes.jobs import PurgeJobResponse
+from app.schemes.table import ReconcileResponse, TableCreate, TableUpdate, TableResponse
 from app.models.table import RestaurantTable
-from app.models.order import Order
-from app.database.core import get_db
+from app.config import settings
+from app.exceptions.base import ObjectAlreadyExistsError
+from app.utils.changes import entity_etag, get_changes, not_modified
+from app.utils.occupancy import reconcile_occupancy
+from app.utils.purge import close_table, count_table_rows, purge_jobs, purge_table_step, reopen_table, run_purge
 
-router = APIRouter(prefix="/api/tables", tags=["tables"])
+router = APIRouter(prefix="/api/tables", tags=["tables"], dependencies=[Depends(get_current_user_id)])
 
 @router.get("/", response_model=List[TableResponse])
-def get_all_tables(db: Session = Depends(get_db)):
+async def get_all_tables(request: Request, response: Response, db: ReadDBDep):
     """Get all restaurant tables"""
-    tables = db.query(RestaurantTable).all()
-    return tables
+    cached = not_modified(request, response, await db.run_sync(entity_etag, "tables"))
+    if cached:
+        return cached
+    return await db.tables.get_all()
+
+@router.get("/changes", response_model=ChangesResponse[TableResponse])
+async def get_table_changes(request: Request, response: Response, db: ReadDBDep, since: Optional[int] = None):
+    """Get tables changed after the cursor, with tombstones for deleted ones"""
+    cached = not_modified(request, response, await db.run_sync(entity_etag, "tables"))
+    if cached:
+        return cached
+    return await db.run_sync(get_changes, RestaurantTable, since)
+
+@router.post("/reconcile", response_model=ReconcileResponse)
+async def reconcile_tables(db: DBDep):
+    """Recount open orders of every table and fix counters that drifted"""
+    return {"fixed": await db.run_sync(reconcile_occupancy)}
 
 @router.get("/{table_id}", response_model=TableResponse)
-def get_table(table_id: int, db: Session = Depends(get_db)):
+async def get_table(table_id: int, db: ReadDBDep):
     """Get specific table"""
-    table = db.query(RestaurantTable).filter(RestaurantTable.id == table_id).first()
+    table = await db.tables.get_one_or_none(id=table_id)
     if not table:
         raise HTTPException(status_code=404, detail="Table not found")
     return table
 
 @router.post("/", response_model=TableResponse)
-def create_table(table_data: TableCreate, db: Session = Depends(get_db)):
+async def create_table(table_data: TableCreate, db: DBDep):
     """Create new table"""
-    existing = db.query(RestaurantTable).filter(
-        RestaurantTable.table_number == table_data.table_number
-    ).first()
-    if existing:
+    try:
+        new_table = await db.tables.add(table_data)
+    except ObjectAlreadyExistsError:
         raise HTTPException(status_code=400, detail="Table number already exists")
-    
-    new_table = RestaurantTable(**table_data.dict())
-    db.add(new_table)
-    db.commit()
-    db.refresh(new_table)
+    await db.commit()
     return new_table
 
 @router.put("/{table_id}", response_model=TableResponse)
-def update_table(table_id: int, table_data: TableUpdate, db: Session = Depends(get_db)):
+async def update_table(table_id: int, table_data: TableUpdate, db: DBDep):
     """Update table"""
-    table = db.query(RestaurantTable).filter(RestaurantTable.id == table_id).first()
+    table = await db.tables.get_one_or_none(id=table_id)
     if not table:
         raise HTTPException(status_code=404, detail="Table not found")
     
-    update_data = table_data.dict(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(table, key, value)
-    
-    db.commit()
-    db.refresh(table)
-    return table
+    if table_data.is_occupied is False and table.open_order_count > 0:
+        raise HTTPException(status_code=400, detail="Table has open orders")
+    if table_data.model_fields_set:
+        await db.tables.edit(table_data, exclude_unset=True, id=table_id)
+        await db.commit()
+    return await db.tables.get_one_or_none(id=table_id)
 
 @router.delete("/{table_id}")
-def delete_table(table_id: int, db: Session = Depends(get_db)):
-    """Delete table and all associated orders"""
+async def delete_table(
+    table_id: int,
+    response: Response,
+    background_tasks: BackgroundTasks,
+    db: DBDep,
+):
+    """Delete table and all associated orders.
+
+    Up to PURGE_CHUNK_SIZE orders are deleted right away; a larger purge
+    runs as a background job and the response is 202 with the job to poll.
+    """
+    table = await db.tables.get_one_or_none(id=table_id)
+    if not table:
+        raise HTTPException(status_code=404, detail="Table not found")
+
+    # До первого удаления: иначе заказ, созданный между порциями, удалил бы
+    # только ON DELETE CASCADE - мимо журнала, аналитики и счётчиков
+    await db.run_sync(close_table, table_id)
+    total = await db.run_sync(count_table_rows, table_id)
+    if total > settings.PURGE_CHUNK_SIZE:
+        # Фоновая задача стартует до закрытия сессии запроса, а соединение записи одно
+        await db.rollback()
+        job, created = purge_jobs.submit("table", table_id, total)
+        if created:
+            background_tasks.add_task(
+                purge_jobs.run, job, purge_table_step(table_id), lambda session: reopen_table(session, table_id)
+            )
+        response.status_code = status.HTTP_202_ACCEPTED
+        return {"message": "Table deletion started", "job": PurgeJobResponse.model_validate(job)}
+
     try:
-        table = db.query(RestaurantTable).filter(RestaurantTable.id == table_id).first()
-        if not table:
-            raise HTTPException(status_code=404, detail="Table not found")
-        
-        orders = db.query(Order).filter(Order.table_id == table_id).all()
-        for order in orders:
-            db.delete(order)
-        
-        db.delete(table)
-        db.commit()
-        
-        return {"message": f"Table deleted successfully (deleted {len(orders)} associated orders)"}
+        deleted = await db.run_sync(run_purge, purge_table_step(table_id))
     except Exception as e:
-        db.rollback()
-        print(f"Error deleting table: {str(e)}")
-        raise HTTPException(status_code=400, detail=f"Error deleting table: {str(e)}")
+        # Удалённые порции уже зафиксированы, а сам стол снова принимает заказы
+        await db.rollback()
+        await db.run_sync(reopen_table, table_id)
+        raise HTTPException(status_code=400, detail=f"Error deleting table: {str(e)}") from e
+    return {"message": f"Table deleted successfully (deleted {deleted - 1} associated orders)"}
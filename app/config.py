@@ -1,4 +1,6 @@
 import os
+from typing import Optional
+from sqlalchemy.engine import make_url
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
@@ -8,6 +10,52 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     DB_NAME: str = "restaurant.db"
     DATABASE_URL: str = "sqlite:///restaurant.db"
+
+    # Архивирование закрытых заказов
+    ARCHIVE_AFTER_DAYS: int = 30
+    ARCHIVE_BATCH_SIZE: int = 200
+    ARCHIVE_INTERVAL_MINUTES: int = 60  # 0 - не запускать по расписанию
+
+    # Каскадное удаление: больше строк удаляется фоновой задачей порциями
+    PURGE_CHUNK_SIZE: int = 500
+
+    # Пул процессов для bcrypt: сверх HASH_WORKERS + HASH_MAX_QUEUE запросов - 503
+    HASH_WORKERS: int = 2
+    HASH_MAX_QUEUE: int = 16
+    # Стоимость bcrypt; без значения подбирается при запуске под HASH_TARGET_MS
+    BCRYPT_ROUNDS: Optional[int] = None
+    HASH_TARGET_MS: int = 250
+
+    # Профиль хранения SQLite: прагмы выставляются на каждом новом соединении
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"  # в режиме WAL не теряет целостность при сбое
+    SQLITE_CACHE_SIZE_KB: int = 65536
+    SQLITE_MMAP_SIZE_MB: int = 256
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_FOREIGN_KEYS: bool = True
+    # Запись идёт через одно соединение, чтение - через отдельный пул
+    SQLITE_READ_POOL_SIZE: int = 4
+
+    # Групповая фиксация заказов: записи, пришедшие за окно, уходят одной транзакцией
+    ORDER_WRITE_WINDOW_MS: int = 5
+    ORDER_WRITE_MAX_BATCH: int = 200
+
+    # Пул соединений сервера БД (PostgreSQL); у SQLite пулы заданы профилем хранения
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30  # секунд ожидания свободного соединения
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE: int = 1800  # секунд; -1 - не пересоздавать
+
+    # Реплика для отчётов и истории заказов. У SQLite это копия файла БД,
+    # которую раз в READ_REPLICA_REFRESH_SECONDS обновляет backup API;
+    # у PostgreSQL - сервер-реплика READ_REPLICA_URL, задержку которого
+    # проверяют с тем же периодом
+    READ_REPLICA_ENABLED: bool = False
+    READ_REPLICA_URL: Optional[str] = None
+    READ_REPLICA_REFRESH_SECONDS: float = 5
+    # Реплика старше этого читается мимо: запрос идёт в основную БД
+    READ_REPLICA_MAX_LAG_SECONDS: float = 15
     
     # Конфигурация для загрузки из .env файла
     model_config = SettingsConfigDict(
@@ -16,9 +64,24 @@ class Settings(BaseSettings):
         case_sensitive=False
     )
     
+    @staticmethod
+    def _async_url(database_url: str) -> str:
+        url = make_url(database_url)
+        if url.drivername == "sqlite":
+            url = url.set(drivername="sqlite+aiosqlite")
+        elif url.drivername in ("postgres", "postgresql"):
+            url = url.set(drivername="postgresql+asyncpg")
+        return url.render_as_string(hide_password=False)
+
     @property
     def get_db_url(self):
-        return f"sqlite:///{self.DB_NAME}"
+        """DATABASE_URL с асинхронным драйвером для create_async_engine"""
+        return self._async_url(self.DATABASE_URL)
+
+    @property
+    def get_replica_url(self):
+        """READ_REPLICA_URL с асинхронным драйвером или None"""
+        return self._async_url(self.READ_REPLICA_URL) if self.READ_REPLICA_URL else None
 
     @property
     def auth_data(self):
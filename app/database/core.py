@@ -1,6 +1,15 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+"""
+Synchronous engine for offline scripts (init_db, reset_db).
+
+The application itself talks to the database only through the async engine
+in app.database.database; Base is re-exported here for the scripts. Their
+sessions write the change journal through the same session hooks as the app.
+"""
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
 from app.config import settings
+from app.database.database import Base, apply_storage_profile
 
 # Используем DATABASE_URL из конфига
 DATABASE_URL = settings.DATABASE_URL
@@ -10,14 +19,13 @@ engine = create_engine(
     connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
 )
 
+if engine.dialect.name == "sqlite":
+    event.listen(engine, "connect", apply_storage_profile)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-# Создаём базовый класс для всех моделей
-Base = declarative_base()
+# Хуки журнала висят на классе Session и регистрируются при импорте модуля:
+# без него записи скриптов не попали бы в /changes и ETag
+import app.utils.changes  # noqa: E402,F401
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+__all__ = ["Base", "DATABASE_URL", "SessionLocal", "apply_storage_profile", "engine"]
@@ -1,28 +1,195 @@
-from datetime import datetime
-from typing import TYPE_CHECKING
+import os
+import time
+from collections import deque
 
-from sqlalchemy import NullPool, func, text
+from sqlalchemy import AsyncAdaptedQueuePool, NullPool, event
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import (
     async_sessionmaker,
     create_async_engine,
 )
-from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+from sqlalchemy.orm import DeclarativeBase
 
 from app.config import settings
+from app.utils.timing import timing_summary
 
-engine = create_async_engine(settings.get_db_url)
+IS_SQLITE = make_url(settings.get_db_url).get_backend_name() == "sqlite"
+
+
+def replica_url() -> str | None:
+    """URL of the read replica; for SQLite the copy defaults to <db>-replica.db"""
+    if not settings.READ_REPLICA_ENABLED:
+        return None
+    if settings.get_replica_url or not IS_SQLITE:
+        return settings.get_replica_url
+    url = make_url(settings.get_db_url)
+    root, ext = os.path.splitext(url.database)
+    return url.set(database=f"{root}-replica{ext or '.db'}").render_as_string(hide_password=False)
+
+
+class MeteredPool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long checkouts wait for a connection"""
+
+    def __init__(self, *args, history_size: int = 1000, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self._wait_times: deque[float] = deque(maxlen=history_size)
+
+    def _do_get(self):
+        # Сюда входит и ожидание свободного соединения, и открытие нового
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.timeouts += 1
+            raise
+        self.checkouts += 1
+        self._wait_times.append(time.perf_counter() - started)
+        return connection
+
+    def metrics(self) -> dict:
+        return {
+            "size": self.size(),
+            "max_overflow": self._max_overflow,
+            "in_use": self.checkedout(),
+            "idle": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait": timing_summary(self._wait_times),
+        }
+
+
+def storage_pragmas() -> list[str]:
+    """PRAGMA statements of the configured SQLite storage profile"""
+    return [
+        # Первым: смена journal_mode ждёт блокировку не дольше busy_timeout
+        f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}",
+        f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}",
+        f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}",
+        # Отрицательное значение - размер в КиБ, а не в страницах
+        f"PRAGMA cache_size=-{settings.SQLITE_CACHE_SIZE_KB}",
+        f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE_MB * 1024 * 1024}",
+        # SQLite проверяет внешние ключи и выполняет ON DELETE CASCADE
+        # только при включённой прагме, а она действует на одно соединение
+        f"PRAGMA foreign_keys={'ON' if settings.SQLITE_FOREIGN_KEYS else 'OFF'}",
+    ]
+
+
+def apply_storage_profile(dbapi_connection, connection_record):
+    """Apply the SQLite storage profile to a new connection"""
+    cursor = dbapi_connection.cursor()
+    for pragma in storage_pragmas():
+        cursor.execute(pragma)
+    cursor.close()
+
+
+def take_over_transactions(dbapi_connection, connection_record):
+    """Let SQLAlchemy emit BEGIN itself instead of the sqlite3 driver"""
+    # Драйвер открывает транзакцию только перед первым INSERT/UPDATE, поэтому
+    # SAVEPOINT до него начинал бы собственную транзакцию, а RELEASE её фиксировал
+    dbapi_connection.isolation_level = None
+
+
+def begin_immediate(connection):
+    """Take the write lock when the transaction starts, not on its first write"""
+    # Повышение блокировки с чтения до записи при занятой базе сразу даёт
+    # SQLITE_BUSY, busy_timeout его не ждёт
+    connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def make_read_only(dbapi_connection, connection_record):
+    """Reject writes on connections of the read pool"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA query_only=ON")
+    cursor.close()
+
+
+def dialect_insert(db, model):
+    """INSERT with ON CONFLICT support for the dialect of the session"""
+    if db.bind.dialect.name == "postgresql":
+        return postgresql_insert(model)
+    return sqlite_insert(model)
+
+
+if IS_SQLITE:
+    # Одно соединение на запись: писатели ждут своей очереди в пуле, а не
+    # в busy_timeout SQLite. В режиме WAL читатели их не блокируют
+    engine = create_async_engine(
+        settings.get_db_url,
+        poolclass=MeteredPool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+    )
+    read_engine = create_async_engine(
+        settings.get_db_url,
+        poolclass=MeteredPool,
+        pool_size=settings.SQLITE_READ_POOL_SIZE,
+        max_overflow=0,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+    )
+else:
+    # Сервер сам разводит читателей и писателей, отдельный пул чтения не нужен
+    engine = create_async_engine(
+        settings.get_db_url,
+        poolclass=MeteredPool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+    )
+    read_engine = engine
+
+REPLICA_URL = replica_url()
+if REPLICA_URL is None:
+    replica_engine = None
+elif IS_SQLITE:
+    replica_engine = create_async_engine(
+        REPLICA_URL,
+        poolclass=MeteredPool,
+        pool_size=settings.SQLITE_READ_POOL_SIZE,
+        max_overflow=0,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+    )
+    # Копия только читается, а её файл заменяется целиком при обновлении,
+    # поэтому прагмы профиля хранения (WAL и т.д.) к ней не применяются
+    event.listen(replica_engine.sync_engine, "connect", make_read_only)
+else:
+    replica_engine = create_async_engine(
+        REPLICA_URL,
+        poolclass=MeteredPool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+    )
 
 engine_null_pool = create_async_engine(settings.get_db_url, poolclass=NullPool)
 
+if IS_SQLITE:
+    for _engine in (engine, read_engine, engine_null_pool):
+        event.listen(_engine.sync_engine, "connect", apply_storage_profile)
+    event.listen(read_engine.sync_engine, "connect", make_read_only)
+    event.listen(engine.sync_engine, "connect", take_over_transactions)
+    event.listen(engine.sync_engine, "begin", begin_immediate)
+
 
 async_session_maker = async_sessionmaker(bind=engine, expire_on_commit=False)
+async_session_maker_read = async_sessionmaker(bind=read_engine, expire_on_commit=False)
+async_session_maker_replica = (
+    async_sessionmaker(bind=replica_engine, expire_on_commit=False) if replica_engine else None
+)
 async_session_maker_null_pool = async_sessionmaker(
     bind=engine_null_pool, expire_on_commit=False
 )
 
 
 class Base(DeclarativeBase):
-    created_at: Mapped[datetime] = mapped_column(server_default=func.now())
-    updated_at: Mapped[datetime] = mapped_column(
-        server_default=func.now(), onupdate=func.now()
-    )
+    """Единая декларативная база всех моделей приложения"""
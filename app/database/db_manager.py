@@ -1,5 +1,9 @@
 from app.database.database import async_session_maker
+from app.repositories.analytics import AnalyticsRepository
+from app.repositories.menu import MenuRepository
+from app.repositories.orders import OrdersRepository
 from app.repositories.roles import RolesRepository
+from app.repositories.tables import TablesRepository
 from app.repositories.users import UsersRepository
 
 class DBManager:
@@ -10,6 +14,10 @@ class DBManager:
         self.session = self.session_factory()
         self.users = UsersRepository(self.session)
         self.roles = RolesRepository(self.session)
+        self.menu = MenuRepository(self.session)
+        self.tables = TablesRepository(self.session)
+        self.orders = OrdersRepository(self.session)
+        self.analytics = AnalyticsRepository(self.session)
         return self
 
     async def __aexit__(self, *args):
@@ -18,3 +26,17 @@ class DBManager:
 
     async def commit(self):
         await self.session.commit()
+
+    async def rollback(self):
+        """Завершает транзакцию и возвращает соединение в пул до следующего запроса к БД"""
+        await self.session.rollback()
+
+    async def run_sync(self, fn, *args, **kwargs):
+        """
+        Вызывает fn(session, *args, **kwargs) с синхронным фасадом той же сессии.
+
+        Общие помощники (журнал изменений, агрегаты продаж, счётчики столов)
+        написаны для Session; так они выполняются в транзакции запроса,
+        а ввод-вывод по-прежнему ждёт драйвер aiosqlite, а не поток.
+        """
+        return await self.session.run_sync(fn, *args, **kwargs)
@@ -2,9 +2,7 @@ from app.database.core import SessionLocal, Base, engine
 from app.models.user import User
 from app.models.menu import MenuItem
 from app.models.table import RestaurantTable
-from passlib.context import CryptContext
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.utils.password_hashing import password_hasher
 
 def init_db():
     """Initialize database with tables and test data"""
@@ -23,19 +21,19 @@ def init_db():
         users = [
             User(
                 username="chefNum1",
-                password_hash=pwd_context.hash("chef123"),
+                password_hash=password_hasher.hash("chef123"),
                 full_name="Ivan Chef",
                 role="chef"
             ),
             User(
                 username="waiterNum1",
-                password_hash=pwd_context.hash("waiter123"),
+                password_hash=password_hasher.hash("waiter123"),
                 full_name="Petr Waiter",
                 role="waiter"
             ),
             User(
                 username="adminNum1",
-                password_hash=pwd_context.hash("admin123"),
+                password_hash=password_hasher.hash("admin123"),
                 full_name="Sergey Admin",
                 role="admin"
             )
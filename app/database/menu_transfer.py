@@ -0,0 +1,66 @@
+"""
+Bulk menu import and export from the command line.
+
+Usage:
+    python -m app.database.menu_transfer import menu.csv
+    python -m app.database.menu_transfer export menu.ndjson
+
+The format is taken from the file extension (.csv or .ndjson).
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+from app.database.database import async_session_maker
+from app.database.db_manager import DBManager
+from app.services.menu import MenuService
+from app.utils.menu_io import FORMATS, parse_rows
+
+READ_CHUNK_SIZE = 64 * 1024
+
+
+async def _read_file(path: Path):
+    with path.open("rb") as file:
+        while chunk := file.read(READ_CHUNK_SIZE):
+            yield chunk
+
+
+async def import_menu(path: Path, format: str) -> int:
+    async with DBManager(session_factory=async_session_maker) as db:
+        result = await MenuService(db).import_items(parse_rows(_read_file(path), format))
+
+    print(f"[OK] Imported {result['imported']} menu items")
+    if result["failed"]:
+        print(f"[ERROR] {result['failed']} rows failed:")
+        for error in result["errors"]:
+            print(f"     row {error['row']}: {'; '.join(error['errors'])}")
+    return 1 if result["failed"] else 0
+
+
+async def export_menu(path: Path, format: str) -> int:
+    async with DBManager(session_factory=async_session_maker) as db:
+        with path.open("wb") as file:
+            async for chunk in MenuService(db).export_items(format):
+                file.write(chunk)
+    print(f"[OK] Menu exported to {path}")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Bulk menu import and export")
+    parser.add_argument("command", choices=["import", "export"])
+    parser.add_argument("path", type=Path)
+    args = parser.parse_args()
+
+    format = args.path.suffix.lstrip(".").lower()
+    if format not in FORMATS:
+        parser.error(f"unsupported file extension, expected one of: {', '.join(FORMATS)}")
+
+    command = import_menu if args.command == "import" else export_menu
+    return asyncio.run(command(args.path, format))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
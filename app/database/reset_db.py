@@ -9,20 +9,13 @@ import os
 import sys
 from sqlalchemy import create_engine, text, event
 from sqlalchemy.engine import Engine
-from app.database.core import Base, SQLALCHEMY_DATABASE_URL
+from app.database.core import Base, DATABASE_URL, apply_storage_profile
 from app.models.user import User
 from app.models.menu import MenuItem
 from app.models.table import RestaurantTable
 from app.models.order import Order
 
 
-def enable_foreign_keys(dbapi_connection, connection_record):
-    """Enable foreign key constraints for SQLite"""
-    cursor = dbapi_connection.cursor()
-    cursor.execute("PRAGMA foreign_keys=ON")
-    cursor.close()
-
-
 def reset_database():
     """
     Complete database reset:
@@ -31,9 +24,9 @@ def reset_database():
     3. Create default users
     """
     
-    engine = create_engine(SQLALCHEMY_DATABASE_URL, echo=True)
+    engine = create_engine(DATABASE_URL, echo=True)
     
-    event.listen(Engine, "connect", enable_foreign_keys)
+    event.listen(Engine, "connect", apply_storage_profile)
     
     print("\n" + "="*60)
     print("🔄 RESETTING DATABASE")
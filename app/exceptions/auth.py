@@ -21,6 +21,10 @@ class UserNotFoundError(MyAppError):
     detail = "Пользователя не существует"
 
 
+class UserInactiveError(MyAppError):
+    detail = "Пользователь заблокирован"
+
+
 class InvalidTokenHTTPError(MyAppHTTPError):
     status_code = 401
     detail = "Неверный токен доступа"
@@ -36,6 +40,11 @@ class NoAccessTokenHTTPError(MyAppHTTPError):
     status_code = 401
 
 
+class AdminRequiredHTTPError(MyAppHTTPError):
+    status_code = 403
+    detail = "Действие доступно только администратору"
+
+
 class UserAlreadyExistsHTTPError(MyAppHTTPError):
     status_code = 409
     detail = "Пользователь с таким email уже существует"
@@ -49,3 +58,16 @@ class UserNotFoundHTTPError(MyAppHTTPError):
 class InvalidPasswordHTTPError(MyAppHTTPError):
     status_code = 401
     detail = "Неверный пароль"
+
+
+class HashingOverloadedError(MyAppError):
+    detail = "Слишком много одновременных входов, повторите попытку"
+
+
+class HashingOverloadedHTTPError(MyAppHTTPError):
+    status_code = 503
+    detail = "Слишком много одновременных входов, повторите попытку"
+
+    def __init__(self):
+        super().__init__()
+        self.headers = {"Retry-After": "1"}
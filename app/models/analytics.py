@@ -0,0 +1,36 @@
+from sqlalchemy import Column, Integer, String, Float, Date
+from app.database.database import Base
+
+class DailySales(Base):
+    __tablename__ = "sales_daily"
+    
+    day = Column(Date, primary_key=True)
+    orders_completed = Column(Integer, nullable=False, default=0)
+    orders_cancelled = Column(Integer, nullable=False, default=0)
+    items_sold = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0.0)
+
+class HourlySales(Base):
+    __tablename__ = "sales_hourly"
+    
+    day = Column(Date, primary_key=True)
+    hour = Column(Integer, primary_key=True)
+    orders_completed = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0.0)
+
+class CategorySales(Base):
+    __tablename__ = "sales_by_category"
+    
+    day = Column(Date, primary_key=True)
+    category = Column(String(50), primary_key=True)
+    quantity = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0.0)
+
+class MenuItemSales(Base):
+    __tablename__ = "sales_by_menu_item"
+    
+    day = Column(Date, primary_key=True)
+    menu_item_id = Column(Integer, primary_key=True)
+    name = Column(String(100), nullable=False)
+    quantity = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0.0)
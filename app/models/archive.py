@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, JSON, Index, func
+from sqlalchemy.dialects.postgresql import JSONB
+from app.database.database import Base
+
+class ArchivedOrder(Base):
+    """Закрытый заказ, перенесённый из orders; позиции хранятся снимком в JSON"""
+    __tablename__ = "orders_archive"
+    
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    table_id = Column(Integer, nullable=False)
+    status = Column(String(20), nullable=False)
+    total_price = Column(Float, nullable=False)
+    waiter_id = Column(Integer, nullable=True)
+    version = Column(Integer, nullable=False, default=1)
+    # В PostgreSQL - JSONB: хранится уже разобранным, его можно индексировать
+    items = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=False)
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+    archived_at = Column(DateTime, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_orders_archive_created_at", "created_at"),
+    )
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, String, DateTime, Index, func
+from app.database.database import Base
+
+class ChangeLog(Base):
+    __tablename__ = "change_log"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    entity = Column(String(20), nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    operation = Column(String(10), nullable=False)
+    changed_at = Column(DateTime, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_change_log_entity_id", "entity", "id"),
+    )
@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String, Float, Text, Boolean, DateTime, func
-from app.database.core import Base
+from sqlalchemy import Column, Integer, String, Float, Text, Boolean, DateTime, Index, func
+from app.database.database import Base
 
 class MenuItem(Base):
     __tablename__ = "menu_items"
@@ -12,3 +12,8 @@ class MenuItem(Base):
     is_available = Column(Boolean, default=True)
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+    # Ключ, по которому массовая загрузка обновляет уже существующие блюда
+    __table_args__ = (
+        Index("uq_menu_items_name_category", "name", "category", unique=True),
+    )
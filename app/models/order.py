@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, func, ForeignKey, JSON
-from app.database.core import Base
+from sqlalchemy import Column, Integer, String, Float, DateTime, func, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from app.database.database import Base
 
 class Order(Base):
     __tablename__ = "orders"
@@ -7,8 +8,40 @@ class Order(Base):
     id = Column(Integer, primary_key=True, index=True)
     table_id = Column(Integer, ForeignKey("restaurant_tables.id", ondelete="CASCADE"), nullable=False)
     status = Column(String(20), default="pending") 
-    items = Column(JSON, nullable=False) 
     total_price = Column(Float, nullable=False)
     waiter_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    # Увеличивается при каждой смене статуса
+    version = Column(Integer, nullable=False, default=1, server_default="1")
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+    # Позиции подгружаются одним IN-запросом на всю выборку заказов
+    items = relationship(
+        "OrderItem",
+        cascade="all, delete-orphan",
+        lazy="selectin",
+        order_by="OrderItem.id",
+    )
+
+    __table_args__ = (
+        Index("ix_orders_created_at", "created_at"),
+        Index("ix_orders_status_created_at", "status", "created_at"),
+        Index("ix_orders_table_id_status", "table_id", "status"),
+        # id удалённого заказа не выдаётся повторно: иначе новый заказ
+        # совпал бы по id с уже перенесённым в архив
+        {"sqlite_autoincrement": True},
+    )
+
+class OrderItem(Base):
+    __tablename__ = "order_items"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    order_id = Column(Integer, ForeignKey("orders.id", ondelete="CASCADE"), nullable=False, index=True)
+    # Без внешнего ключа: блюдо можно удалить из меню, позиции заказа хранят снимок
+    menu_item_id = Column(Integer, nullable=False, index=True)
+    name = Column(String(100), nullable=False)
+    price = Column(Float, nullable=False)
+    quantity = Column(Integer, nullable=False)
+    # Категория блюда на момент заказа: по ней заказ учитывается в сводках
+    # продаж и списывается из них, даже если блюдо потом перенесли или удалили
+    category = Column(String(50), nullable=True)
@@ -1,17 +1,16 @@
-from typing import TYPE_CHECKING
+from datetime import datetime
 
-from sqlalchemy import String
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import String, func
+from sqlalchemy.orm import Mapped, mapped_column
 from app.database.database import Base
 
-if TYPE_CHECKING:
-    from app.models.users import UserModel
-
 
 class RoleModel(Base):
     __tablename__ = "roles"
 
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(String(50), unique=True, nullable=False)
-
-    users: Mapped[list["UserModel"]] = relationship(back_populates="role")
+    created_at: Mapped[datetime] = mapped_column(server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(
+        server_default=func.now(), onupdate=func.now()
+    )
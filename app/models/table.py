@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, func
-from app.database.core import Base
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, func, true
+from app.database.database import Base
 
 class RestaurantTable(Base):
     __tablename__ = "restaurant_tables"
@@ -8,5 +8,9 @@ class RestaurantTable(Base):
     table_number = Column(Integer, nullable=False, unique=True)
     seats = Column(Integer, nullable=False)
     is_occupied = Column(Boolean, default=False)
+    # Число незакрытых заказов; меняется в той же транзакции, что и заказы
+    open_order_count = Column(Integer, nullable=False, default=0, server_default="0")
+    # Сбрасывается в начале удаления стола: новые заказы на него не принимаются
+    accepts_orders = Column(Boolean, nullable=False, default=True, server_default=true())
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
@@ -1,5 +1,5 @@
 from sqlalchemy import Column, Integer, String, DateTime, func, Boolean
-from app.database.core import Base
+from app.database.database import Base
 
 class User(Base):
     __tablename__ = "users"
@@ -0,0 +1,80 @@
+from datetime import date
+
+from sqlalchemy import func, select
+
+from app.models.analytics import CategorySales, DailySales, HourlySales, MenuItemSales
+from app.schemes.analytics import (
+    CategorySalesResponse,
+    DailySalesResponse,
+    DishSalesResponse,
+    HourlySalesResponse,
+)
+
+
+def _in_range(query, model, date_from: date | None, date_to: date | None):
+    if date_from:
+        query = query.filter(model.day >= date_from)
+    if date_to:
+        query = query.filter(model.day <= date_to)
+    return query
+
+
+class AnalyticsRepository:
+    """
+    Отчёты по предагрегированным таблицам sales_*.
+
+    Таблица заказов в отчётах не участвует.
+    """
+
+    def __init__(self, session):
+        self.session = session
+
+    async def daily(self, date_from: date | None, date_to: date | None) -> list[DailySalesResponse]:
+        query = _in_range(select(DailySales), DailySales, date_from, date_to).order_by(DailySales.day)
+        result = await self.session.execute(query)
+        return [DailySalesResponse.model_validate(row, from_attributes=True) for row in result.scalars().all()]
+
+    async def hourly(self, date_from: date | None, date_to: date | None) -> list[HourlySalesResponse]:
+        query = _in_range(select(HourlySales), HourlySales, date_from, date_to)
+        result = await self.session.execute(query.order_by(HourlySales.day, HourlySales.hour))
+        return [HourlySalesResponse.model_validate(row, from_attributes=True) for row in result.scalars().all()]
+
+    async def categories(self, date_from: date | None, date_to: date | None) -> list[CategorySalesResponse]:
+        query = select(
+            CategorySales.category,
+            func.sum(CategorySales.quantity).label("quantity"),
+            func.sum(CategorySales.revenue).label("revenue"),
+        )
+        query = _in_range(query, CategorySales, date_from, date_to)
+        query = query.group_by(CategorySales.category).order_by(func.sum(CategorySales.revenue).desc())
+        result = await self.session.execute(query)
+        return [
+            CategorySalesResponse(category=row.category, quantity=row.quantity, revenue=row.revenue)
+            for row in result.all()
+        ]
+
+    async def top_dishes(self, limit: int, date_from: date | None, date_to: date | None) -> list[DishSalesResponse]:
+        quantity = func.sum(MenuItemSales.quantity)
+        query = select(
+            MenuItemSales.menu_item_id,
+            func.max(MenuItemSales.name).label("name"),
+            quantity.label("quantity"),
+            func.sum(MenuItemSales.revenue).label("revenue"),
+        )
+        query = _in_range(query, MenuItemSales, date_from, date_to)
+        query = query.group_by(MenuItemSales.menu_item_id).order_by(quantity.desc()).limit(limit)
+        result = await self.session.execute(query)
+        return [
+            DishSalesResponse(menu_item_id=row.menu_item_id, name=row.name, quantity=row.quantity, revenue=row.revenue)
+            for row in result.all()
+        ]
+
+    async def completed_totals(self, date_from: date | None, date_to: date | None) -> tuple[int, float]:
+        """Число завершённых заказов и выручка за период"""
+        query = select(
+            func.coalesce(func.sum(DailySales.orders_completed), 0),
+            func.coalesce(func.sum(DailySales.revenue), 0.0),
+        )
+        result = await self.session.execute(_in_range(query, DailySales, date_from, date_to))
+        orders_completed, revenue = result.one()
+        return orders_completed, revenue
@@ -1,19 +1,65 @@
-from pydantic import BaseModel
-from sqlalchemy import delete, insert, select, update
+from functools import cache
+
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import delete, func, insert, inspect, select, update
 from sqlalchemy.exc import IntegrityError
 
 
-from app.database.database import Base
+from app.database.database import Base, dialect_insert
 from app.exceptions.base import ObjectAlreadyExistsError
+from app.utils.changes import DELETE, UPSERT, record_changes
+
+
+@cache
+def _projection(model, schema) -> tuple | None:
+    """Колонки под все поля схемы или None, если какое-то поле не колонка модели"""
+    column_attrs = inspect(model).column_attrs
+    if not all(name in column_attrs for name in schema.model_fields):
+        return None
+    return tuple(getattr(model, name) for name in schema.model_fields)
+
+
+@cache
+def _list_adapter(schema) -> TypeAdapter:
+    return TypeAdapter(list[schema])
 
 
 class BaseRepository:
     model: Base = None
     schema: BaseModel = None
+    # Имя сущности в журнале изменений; запросы репозитория идут мимо
+    # flush сессии, поэтому журнал пишется здесь же, в той же транзакции
+    journal: str | None = None
 
     def __init__(self, session):
         self.session = session
 
+    def _select(self):
+        """
+        SELECT для списков.
+
+        Если все поля схемы - колонки модели, выбираются только они:
+        строки не превращаются в ORM-объекты и не попадают в identity map.
+        Иначе (например, у схемы есть связи) - полные объекты модели.
+        """
+        columns = _projection(self.model, self.schema)
+        return select(*columns) if columns else select(self.model)
+
+    def _validate_all(self, result) -> list[BaseModel]:
+        if _projection(self.model, self.schema):
+            # Вся выборка проверяется одним вызовом pydantic-core
+            return _list_adapter(self.schema).validate_python(result.mappings().all())
+        return [
+            self.schema.model_validate(model, from_attributes=True)
+            for model in result.scalars().all()
+        ]
+
+    async def _journal(self, ids: list[int], operation: str = UPSERT) -> None:
+        if self.journal and ids:
+            await self.session.run_sync(
+                lambda session: record_changes(session, self.journal, ids, operation)
+            )
+
     async def get_filtered(
         self,
         limit: int | None = None,
@@ -21,25 +67,44 @@ class BaseRepository:
         *filter,
         **filter_by,
     ) -> list[BaseModel]:
+        """Возвращает отфильтрованные записи по возрастанию id"""
         filter_by = {k: v for k, v in filter_by.items() if v is not None}
         filter_ = [v for v in filter if v is not None]
 
-        query = select(self.model).filter(*filter_).filter_by(**filter_by)
+        query = self._select().filter(*filter_).filter_by(**filter_by)
 
-        if limit is not None and offset is not None:
-            query = query.limit(limit).offset(offset)
+        # SQLite отдаёт строки в порядке rowid и без ORDER BY, PostgreSQL - нет
+        query = query.order_by(self.model.id)
+        if limit is not None:
+            query = query.limit(limit)
+        if offset is not None:
+            query = query.offset(offset)
         result = await self.session.execute(query)
-        result = [
-            self.schema.model_validate(model, from_attributes=True)
-            for model in result.scalars().all()
-        ]
-
-        return result
+        return self._validate_all(result)
 
     async def get_all(self, *args, **kwargs) -> list[BaseModel]:
         """Возращает все записи в БД из связаной таблицы"""
         return await self.get_filtered(*args, **kwargs)
 
+    async def iter_chunks(self, *filter, chunk_size: int = 500, **filter_by):
+        """Все записи порциями по возрастанию id, не держа выборку целиком в памяти"""
+        last_id = 0
+        while True:
+            query = (
+                self._select()
+                .filter(self.model.id > last_id, *filter)
+                .filter_by(**filter_by)
+                .order_by(self.model.id)
+                .limit(chunk_size)
+            )
+            result = await self.session.execute(query)
+            items = self._validate_all(result)
+            if not items:
+                return
+            yield items
+            last_id = items[-1].id
+            self.session.expunge_all()
+
     async def get_one_or_none(self, **filter_by) -> None | BaseModel:
         query = select(self.model).filter_by(**filter_by)
 
@@ -60,19 +125,47 @@ class BaseRepository:
             result = await self.session.execute(add_stmt)
 
             model = result.scalars().one_or_none()
-            if model is None:
-                return None
-            return self.schema.model_validate(model, from_attributes=True)
-
         except IntegrityError as exc:
             raise ObjectAlreadyExistsError from exc
 
-    async def add_bulk(self, data: list[BaseModel]) -> None | BaseModel:
+        if model is None:
+            return None
+        await self._journal([model.id])
+        return self.schema.model_validate(model, from_attributes=True)
+
+    async def add_bulk(
+        self, data: list[BaseModel], conflict_columns: list[str] | None = None
+    ) -> list[int]:
         """
-        Метод для множественного добавления данных в таблицу
+        Метод для множественного добавления данных в таблицу.
+
+        Строки передаются одним executemany. Если заданы conflict_columns,
+        записи с такими же значениями этих колонок обновляются (upsert);
+        для них нужен уникальный индекс. Возвращает id затронутых записей.
         """
-        add_stmt = insert(self.model).values([item.model_dump() for item in data])
-        await self.session.execute(add_stmt)
+        if not data:
+            return []
+        rows = [item.model_dump() for item in data]
+
+        if conflict_columns:
+            add_stmt = dialect_insert(self.session, self.model)
+            set_ = {
+                column: add_stmt.excluded[column]
+                for column in rows[0]
+                if column not in conflict_columns
+            }
+            if "updated_at" in self.model.__table__.c:
+                set_["updated_at"] = func.now()
+            add_stmt = add_stmt.on_conflict_do_update(
+                index_elements=conflict_columns, set_=set_
+            )
+        else:
+            add_stmt = insert(self.model)
+
+        result = await self.session.execute(add_stmt.returning(self.model.id), rows)
+        ids = list(result.scalars().all())
+        await self._journal(ids)
+        return ids
 
     async def delete(self, *filters, **filter_by) -> None:
         delete_stmt = delete(self.model)
@@ -81,7 +174,8 @@ class BaseRepository:
         if filter_by:
             delete_stmt = delete_stmt.filter_by(**filter_by)
 
-        await self.session.execute(delete_stmt)
+        result = await self.session.execute(delete_stmt.returning(self.model.id))
+        await self._journal(list(result.scalars().all()), DELETE)
         await self.session.commit()
 
     async def edit(
@@ -91,5 +185,10 @@ class BaseRepository:
             update(self.model)
             .filter_by(**filter_by)
             .values(**data.model_dump(exclude_unset=exclude_unset))
+            .returning(self.model.id)
         )
-        await self.session.execute(edit_stmt)
+        try:
+            result = await self.session.execute(edit_stmt)
+        except IntegrityError as exc:
+            raise ObjectAlreadyExistsError from exc
+        await self._journal(list(result.scalars().all()))
@@ -0,0 +1,9 @@
+from app.models.menu import MenuItem
+from app.repositories.base import BaseRepository
+from app.schemes.menu import MenuItemResponse
+
+
+class MenuRepository(BaseRepository):
+    model = MenuItem
+    schema = MenuItemResponse
+    journal = "menu"
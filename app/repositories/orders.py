@@ -0,0 +1,44 @@
+from pydantic import BaseModel
+from sqlalchemy import select, tuple_
+
+from app.models.order import Order
+from app.repositories.base import BaseRepository
+from app.schemes.order import OrderResponse
+
+
+class OrdersRepository(BaseRepository):
+    model = Order
+    schema = OrderResponse
+    journal = "orders"
+
+    async def get_recent_page(
+        self, *filter, limit: int, after_id: int | None = None
+    ) -> tuple[list[BaseModel], int | None]:
+        """
+        Страница заказов от новых к старым по (created_at, id).
+
+        Страница после after_id продолжается сразу под этим заказом в индексе
+        по created_at, поэтому дальние страницы стоят столько же, сколько первая.
+        """
+        query = select(self.model).filter(*filter)
+        if after_id is not None:
+            anchor_exists = await self.session.scalar(
+                select(self.model.id).where(self.model.id == after_id)
+            )
+            if anchor_exists is None:
+                # Заказ-курсор удалён: id растут вместе с created_at
+                query = query.filter(self.model.id < after_id)
+            else:
+                # created_at курсора берётся подзапросом, чтобы SQLite сравнивал
+                # значения в собственном формате, а не привязанный datetime
+                anchor = select(self.model.created_at).where(self.model.id == after_id).scalar_subquery()
+                query = query.filter(tuple_(self.model.created_at, self.model.id) < tuple_(anchor, after_id))
+
+        query = query.order_by(self.model.created_at.desc(), self.model.id.desc()).limit(limit + 1)
+        result = await self.session.execute(query)
+        orders = [
+            self.schema.model_validate(model, from_attributes=True)
+            for model in result.scalars().all()
+        ]
+        next_id = orders[limit - 1].id if len(orders) > limit else None
+        return orders[:limit], next_id
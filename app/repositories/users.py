@@ -1,28 +1,18 @@
 from sqlalchemy import select
-from sqlalchemy.orm import selectinload
 
-from app.models.users import UserModel
+from app.models.user import User
 from app.repositories.base import BaseRepository
-from app.schemes.users import SUserGet
-from app.schemes.relations_users_roles import SUserGetWithRels
+from app.schemes.user import UserCredentials, UserResponse
 
 
 class UsersRepository(BaseRepository):
-    model = UserModel
-    schema = SUserGet
-
-    async def get_one_or_none_with_role(self, **filter_by):
-        query = (
-            select(self.model)
-            .filter_by(**filter_by)
-            .options(selectinload(self.model.role))
-        )
-
-        result = await self.session.execute(query)
+    model = User
+    schema = UserResponse
 
+    async def get_credentials(self, **filter_by) -> UserCredentials | None:
+        """Пользователь вместе с хэшем пароля - только для входа"""
+        result = await self.session.execute(select(self.model).filter_by(**filter_by))
         model = result.scalars().one_or_none()
         if model is None:
             return None
-
-        result = SUserGetWithRels.model_validate(model, from_attributes=True)
-        return result
+        return UserCredentials.model_validate(model, from_attributes=True)
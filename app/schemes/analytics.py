@@ -0,0 +1,40 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import date
+
+class DailySalesResponse(BaseModel):
+    day: date
+    orders_completed: int
+    orders_cancelled: int
+    items_sold: int
+    revenue: float
+
+    class Config:
+        from_attributes = True
+
+class HourlySalesResponse(BaseModel):
+    day: date
+    hour: int
+    orders_completed: int
+    revenue: float
+
+    class Config:
+        from_attributes = True
+
+class CategorySalesResponse(BaseModel):
+    category: str
+    quantity: int
+    revenue: float
+
+class DishSalesResponse(BaseModel):
+    menu_item_id: int
+    name: str
+    quantity: int
+    revenue: float
+
+class AverageTicketResponse(BaseModel):
+    date_from: Optional[date]
+    date_to: Optional[date]
+    orders_completed: int
+    revenue: float
+    average_ticket: float
@@ -0,0 +1,9 @@
+from pydantic import BaseModel
+from typing import Generic, List, TypeVar
+
+T = TypeVar("T")
+
+class ChangesResponse(BaseModel, Generic[T]):
+    cursor: int
+    changed: List[T]
+    deleted: List[int]
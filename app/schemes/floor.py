@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+
+class FloorTableResponse(BaseModel):
+    id: int
+    table_number: int
+    seats: int
+    is_occupied: bool
+    open_orders: int
+    ready_orders: int
+    ready_order_ids: List[int]
+    # Время UTC; возраст считает клиент, чтобы ответ оставался кэшируемым по ETag
+    oldest_open_at: Optional[datetime]
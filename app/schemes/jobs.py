@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+class PurgeJobResponse(BaseModel):
+    id: str
+    kind: str
+    target: str
+    status: str
+    total: int
+    deleted: int
+    error: Optional[str]
+    created_at: datetime
+    finished_at: Optional[datetime]
+
+    class Config:
+        from_attributes = True
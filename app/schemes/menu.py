@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 class MenuItemCreate(BaseModel):
@@ -28,3 +28,21 @@ class MenuItemResponse(BaseModel):
     
     class Config:
         from_attributes = True
+
+class CategoryFacet(BaseModel):
+    category: str
+    count: int
+
+class MenuSearchResponse(BaseModel):
+    items: List[MenuItemResponse]
+    facets: List[CategoryFacet]
+    total: int
+
+class MenuImportError(BaseModel):
+    row: int
+    errors: List[str]
+
+class MenuImportResponse(BaseModel):
+    imported: int
+    failed: int
+    errors: List[MenuImportError]
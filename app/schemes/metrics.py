@@ -0,0 +1,76 @@
+from pydantic import BaseModel
+from typing import Optional
+
+class TimingSummary(BaseModel):
+    avg_ms: float
+    p95_ms: float
+    max_ms: float
+
+class HashingMetricsResponse(BaseModel):
+    rounds: Optional[int]
+    # config - из BCRYPT_ROUNDS, benchmark - подобрано при запуске
+    rounds_source: Optional[str]
+    workers: int
+    max_queue: int
+    in_flight: int
+    completed: int
+    rejected: int
+    failed: int
+    # Замены пула после гибели процесса
+    restarts: int
+    # Ожидание в очереди пула и передача между процессами
+    wait: TimingSummary
+    # Сам bcrypt в процессе пула
+    hash: TimingSummary
+
+class OrderWriterMetricsResponse(BaseModel):
+    window_ms: float
+    max_batch: int
+    queued: int
+    batches: int
+    writes: int
+    failed: int
+    avg_batch: float
+    largest_batch: int
+    # От постановки в очередь до начала транзакции пачки
+    wait: TimingSummary
+    # Вся транзакция пачки вместе с COMMIT
+    commit: TimingSummary
+
+class PoolMetricsResponse(BaseModel):
+    # writer - пул записи, reader - пул чтения SQLite (у PostgreSQL пул
+    # один), replica - пул реплики, если она включена
+    name: str
+    dialect: str
+    size: int
+    max_overflow: int
+    in_use: int
+    idle: int
+    overflow: int
+    checkouts: int
+    timeouts: int
+    # Ожидание соединения из пула, включая открытие нового
+    wait: TimingSummary
+
+class ReplicaPrimaryReads(BaseModel):
+    # Реплики ещё нет / отстаёт больше допустимого / у клиента свежая запись
+    unavailable: int
+    stale: int
+    recent_write: int
+
+class ReplicaMetricsResponse(BaseModel):
+    enabled: bool
+    lag_seconds: Optional[float]
+    max_lag_seconds: float
+    replica_reads: int
+    primary_reads: ReplicaPrimaryReads
+    refreshes: int
+    refresh_errors: int
+    # Копирование файла SQLite или запрос задержки реплики PostgreSQL
+    refresh: TimingSummary
+
+class AuthCacheMetricsResponse(BaseModel):
+    cached_tokens: int
+    hits: int
+    misses: int
+    denied_entries: int
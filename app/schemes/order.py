@@ -1,7 +1,24 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime
 
+ORDER_STATUSES = ("pending", "confirmed", "ready", "completed", "cancelled")
+# Статусы, после которых стол освобождается
+CLOSED_STATUSES = ("completed", "cancelled")
+
+# Допустимые переходы: текущий статус -> новые статусы.
+# Завершённый и отменённый заказы больше не меняются
+ORDER_TRANSITIONS = {
+    "pending": ("confirmed", "ready", "completed", "cancelled"),
+    "confirmed": ("ready", "completed", "cancelled"),
+    "ready": ("completed", "cancelled"),
+    "completed": (),
+    "cancelled": (),
+}
+
+# Сколько заказов можно изменить одним запросом
+MAX_BULK_ORDERS = 500
+
 class OrderItem(BaseModel):
     menu_item_id: int
     quantity: int
@@ -13,16 +30,54 @@ class OrderCreate(BaseModel):
 class OrderUpdate(BaseModel):
     status: Optional[str] = None
     items: Optional[List[OrderItem]] = None
+    # Версия, которую видел клиент; при расхождении вернётся 409
+    version: Optional[int] = None
+
+class OrderStatusChange(BaseModel):
+    order_id: int
+    status: str
+    version: Optional[int] = None
+
+class BulkStatusUpdate(BaseModel):
+    orders: List[OrderStatusChange] = Field(..., min_length=1, max_length=MAX_BULK_ORDERS)
+
+class OrderStatusResult(BaseModel):
+    order_id: int
+    result: str
+    status: Optional[str] = None
+    detail: Optional[str] = None
+
+class BulkStatusResponse(BaseModel):
+    updated: int
+    results: List[OrderStatusResult]
+
+class OrderItemResponse(BaseModel):
+    menu_item_id: int
+    name: str
+    quantity: int
+    price: float
+    
+    class Config:
+        from_attributes = True
 
 class OrderResponse(BaseModel):
     id: int
     table_id: int
     status: str
-    items: List[dict]
+    items: List[OrderItemResponse]
     total_price: float
     waiter_id: Optional[int]
+    version: int
     created_at: datetime
     updated_at: datetime
     
     class Config:
         from_attributes = True
+
+def source_statuses(status: str) -> tuple:
+    """Statuses an order may be in to move to ``status``"""
+    return tuple(source for source, targets in ORDER_TRANSITIONS.items() if status in targets)
+
+def order_payload(order) -> dict:
+    """JSON-ready representation of an Order row"""
+    return OrderResponse.model_validate(order).model_dump(mode="json")
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 class TableCreate(BaseModel):
@@ -15,8 +15,18 @@ class TableResponse(BaseModel):
     table_number: int
     seats: int
     is_occupied: bool
+    open_order_count: int
+    accepts_orders: bool
     created_at: datetime
     updated_at: datetime
     
     class Config:
         from_attributes = True
+
+class OccupancyFix(BaseModel):
+    table_id: int
+    recorded: int
+    actual: int
+
+class ReconcileResponse(BaseModel):
+    fixed: List[OccupancyFix]
@@ -25,6 +25,20 @@ class UserResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class UserAdd(BaseModel):
+    username: str
+    password_hash: str
+    full_name: str
+    role: str
+
+class UserPatch(BaseModel):
+    full_name: Optional[str] = None
+    password_hash: Optional[str] = None
+    is_active: Optional[bool] = None
+
+class UserCredentials(UserResponse):
+    password_hash: str
+
 class LoginRequest(BaseModel):
     username: str
     password: str
@@ -1,36 +0,0 @@
-from typing import TYPE_CHECKING
-
-from pydantic import BaseModel, EmailStr
-
-if TYPE_CHECKING:
-    from app.schemes.roles import SRoleGet
-
-
-class SUserAddRequest(BaseModel):
-    name: str
-    email: EmailStr
-    password: str
-    role_id: int
-
-
-class SUserAdd(BaseModel):
-    name: str
-    email: EmailStr
-    hashed_password: str
-    role_id: int
-
-
-class SUserAuth(BaseModel):
-    email: EmailStr
-    password: str
-
-
-class SUserGet(SUserAdd):
-    id: int
-
-
-class SUserPatch(BaseModel):
-    name: str | None = None
-    email: EmailStr | None = None
-    hashed_password: str | None = None
-    role_id: int | None = None
@@ -3,43 +3,56 @@ from datetime import datetime, timezone, timedelta
 from app.config import settings
 from app.exceptions.auth import (
     UserAlreadyExistsError,
+    UserInactiveError,
     UserNotFoundError,
     InvalidPasswordError,
     InvalidJWTTokenError,
     JWTTokenExpiredError,
 )
 from app.exceptions.base import ObjectAlreadyExistsError
-from app.schemes.users import (
-    SUserAdd,
-    SUserAddRequest,
-    SUserAuth,
+from app.schemes.user import (
+    LoginRequest,
+    UserAdd,
+    UserCreate,
+    UserCredentials,
+    UserPatch,
+    UserResponse,
 )
-from app.schemes.relations_users_roles import SUserGetWithRels
 from app.services.base import BaseService
+from app.utils.password_hashing import password_hasher
 import jwt
-from passlib.context import CryptContext
 
 
 class AuthService(BaseService):
-    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
     @classmethod
     def create_access_token(cls, data: dict) -> str:
         to_encode = data.copy()
-        expire: datetime = datetime.now(timezone.utc) + timedelta(
+        issued_at: datetime = datetime.now(timezone.utc)
+        expire: datetime = issued_at + timedelta(
             minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
         )
-        to_encode |= {"exp": expire}
+        # iat с долями секунды: по нему отзываются токены, выданные до отзыва
+        to_encode |= {"exp": expire, "iat": issued_at.timestamp()}
         encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, settings.ALGORITHM)
         return encoded_jwt
 
     @classmethod
-    def verify_password(cls, plain_password, hashed_password) -> bool:
-        return cls.pwd_context.verify(plain_password, hashed_password)
+    def refresh_at(cls, claims: dict) -> float:
+        """Moment after which a token with ``claims`` is re-issued: half its lifetime"""
+        return claims["exp"] - settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60 / 2
+
+    @classmethod
+    def refresh_token(cls, claims: dict) -> str:
+        """New token with the same claims and a full lifetime"""
+        return cls.create_access_token({k: v for k, v in claims.items() if k not in ("exp", "iat")})
+
+    @classmethod
+    async def verify_password(cls, plain_password, hashed_password) -> tuple[bool, str | None]:
+        return await password_hasher.verify_and_update_async(plain_password, hashed_password)
 
     @classmethod
-    def hash_password(cls, plain_password) -> str:
-        return cls.pwd_context.hash(plain_password)
+    async def hash_password(cls, plain_password) -> str:
+        return await password_hasher.hash_async(plain_password)
 
     @classmethod
     def decode_token(cls, token: str) -> dict:
@@ -49,39 +62,50 @@ class AuthService(BaseService):
             raise InvalidJWTTokenError from ex
         except jwt.exceptions.ExpiredSignatureError as ex:
             raise JWTTokenExpiredError from ex
+        except jwt.exceptions.InvalidTokenError as ex:
+            raise InvalidJWTTokenError from ex
 
-    async def register_user(self, user_data: SUserAddRequest):
+    async def register_user(self, user_data: UserCreate) -> UserResponse:
+        password_hash: str = await self.hash_password(user_data.password)
         try:
-            hashed_password: str = self.hash_password(user_data.password)
-            new_user_data = SUserAdd(
-                email=user_data.email,
-                hashed_password=hashed_password,
-                name=user_data.name,
-                role_id=user_data.role_id,
+            user = await self.db.users.add(
+                UserAdd(
+                    username=user_data.username,
+                    password_hash=password_hash,
+                    full_name=user_data.full_name,
+                    role=user_data.role,
+                )
             )
-            await self.db.users.add(new_user_data)
         except ObjectAlreadyExistsError:
             raise UserAlreadyExistsError
         await self.db.commit()
+        return user
 
-    async def login_user(self, user_data: SUserAuth):
-        user = await self.db.users.get_one_or_none_with_role(email=user_data.email)
+    async def login_user(self, credentials: LoginRequest) -> tuple[UserCredentials, str]:
+        user = await self.db.users.get_credentials(username=credentials.username)
         if not user:
             raise UserNotFoundError
-        if not self.verify_password(user_data.password, user.hashed_password):
+        # Соединение записи не должно простаивать, пока bcrypt считает хэш
+        await self.db.rollback()
+        verified, new_hash = await self.verify_password(credentials.password, user.password_hash)
+        if not verified:
             raise InvalidPasswordError
+        if not user.is_active:
+            raise UserInactiveError
+        # Хэш со старой стоимостью заменяется, пока открытый пароль под рукой
+        if new_hash:
+            await self.db.users.edit(UserPatch(password_hash=new_hash), exclude_unset=True, id=user.id)
+            await self.db.commit()
         access_token: str = self.create_access_token(
             {
                 "user_id": user.id,
-                "role": user.role.name,
+                "role": user.role,
             }
         )
-        return access_token
+        return user, access_token
 
-    async def get_me(self, user_id: int):
-        user: SUserGetWithRels | None = await self.db.users.get_one_or_none_with_role(
-            id=user_id
-        )
+    async def get_me(self, user_id: int) -> UserResponse:
+        user: UserResponse | None = await self.db.users.get_one_or_none(id=user_id)
         if not user:
             raise UserNotFoundError
         return user
@@ -0,0 +1,71 @@
+from typing import AsyncIterator
+
+from pydantic import ValidationError
+
+from app.schemes.menu import MenuItemCreate
+from app.services.base import BaseService
+from app.utils.menu_cache import menu_snapshot
+from app.utils.menu_io import to_csv, to_ndjson
+
+IMPORT_CHUNK_SIZE = 500
+EXPORT_CHUNK_SIZE = 500
+# Больше ошибок не возвращаем, чтобы ответ на огромный файл оставался небольшим
+MAX_REPORTED_ERRORS = 1000
+
+
+class MenuService(BaseService):
+
+    async def _save_chunk(self, chunk: dict) -> int:
+        ids = await self.db.menu.add_bulk(
+            list(chunk.values()), conflict_columns=["name", "category"]
+        )
+        await self.db.commit()
+        return len(ids)
+
+    async def import_items(self, rows: AsyncIterator[tuple[int, dict | str]]) -> dict:
+        """
+        Загружает блюда порциями по IMPORT_CHUNK_SIZE, каждая порция в своей
+        транзакции. Блюдо с теми же названием и категорией обновляется.
+        """
+        imported = 0
+        failed = 0
+        errors = []
+        # Внутри порции повтор блюда заменяет предыдущую строку
+        chunk: dict[tuple[str, str], MenuItemCreate] = {}
+
+        async for row_number, data in rows:
+            try:
+                if isinstance(data, str):
+                    raise ValueError(data)
+                item = MenuItemCreate.model_validate(data)
+            except ValidationError as exc:
+                messages = [
+                    f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+                    for error in exc.errors()
+                ]
+            except ValueError as exc:
+                messages = [str(exc)]
+            else:
+                chunk[(item.name, item.category)] = item
+                if len(chunk) >= IMPORT_CHUNK_SIZE:
+                    imported += await self._save_chunk(chunk)
+                    chunk = {}
+                continue
+
+            failed += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append({"row": row_number, "errors": messages})
+
+        if chunk:
+            imported += await self._save_chunk(chunk)
+        if imported:
+            menu_snapshot.invalidate()
+        return {"imported": imported, "failed": failed, "errors": errors}
+
+    async def export_items(self, format: str) -> AsyncIterator[bytes]:
+        header = format == "csv"
+        async for items in self.db.menu.iter_chunks(chunk_size=EXPORT_CHUNK_SIZE):
+            yield to_csv(items, header) if format == "csv" else to_ndjson(items)
+            header = False
+        if header:
+            yield to_csv([], header=True)
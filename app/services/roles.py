@@ -1,7 +1,6 @@
 from app.exceptions.base import ObjectAlreadyExistsError
 from app.exceptions.roles import RoleNotFoundError, RoleAlreadyExistsError
-from app.schemes.roles import SRoleAdd
-from app.schemes.relations_users_roles import SRoleGetWithRels
+from app.schemes.roles import SRoleAdd, SRoleGet
 from app.services.base import BaseService
 
 
@@ -15,23 +14,21 @@ class RoleService(BaseService):
         await self.db.commit()
 
     async def get_role(self, role_id: int):
-        role: SRoleGetWithRels | None = await self.db.roles.get_one_or_none_with_users(
-            id=role_id
-        )
+        role: SRoleGet | None = await self.db.roles.get_one_or_none(id=role_id)
         if not role:
             raise RoleNotFoundError
         return role
 
     async def edit_role(self, role_id: int, role_data: SRoleAdd):
-        role: SRoleGetWithRels | None = await self.db.roles.get_one_or_none(id=role_id)
+        role: SRoleGet | None = await self.db.roles.get_one_or_none(id=role_id)
         if not role:
             raise RoleNotFoundError
-        await self.db.roles.edit(role_data)
+        await self.db.roles.edit(role_data, id=role_id)
         await self.db.commit()
         return
 
     async def delete_role(self, role_id: int):
-        role: SRoleGetWithRels | None = await self.db.roles.get_one_or_none(id=role_id)
+        role: SRoleGet | None = await self.db.roles.get_one_or_none(id=role_id)
         if not role:
             raise RoleNotFoundError
         await self.db.roles.delete(id=role_id)
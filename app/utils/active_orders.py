@@ -0,0 +1,70 @@
+import threading
+from typing import List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.order import Order
+from app.schemes.order import order_payload
+from app.utils.changes import current_cursor, get_changes
+
+# Статусы, которые видит кухня и официанты
+ACTIVE_STATUSES = ("pending", "confirmed", "ready")
+
+
+class ActiveOrdersBoard:
+    """In-memory read model of orders that are still being worked on.
+
+    Order routes apply their own writes right after commit. Before every
+    read the board also replays the change journal from its cursor, which
+    picks up writes made by other workers or through SQLAdmin. Reading the
+    board therefore costs O(active orders) plus a journal tail lookup.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._orders: dict[int, dict] = {}
+        self._cursor: Optional[int] = None
+
+    def apply(self, payload: dict) -> None:
+        """Track an order after a committed write"""
+        with self._lock:
+            if payload["status"] in ACTIVE_STATUSES:
+                self._orders[payload["id"]] = payload
+            else:
+                self._orders.pop(payload["id"], None)
+
+    def remove(self, order_id: int) -> None:
+        with self._lock:
+            self._orders.pop(order_id, None)
+
+    def refresh(self, db: Session) -> None:
+        with self._lock:
+            cursor = self._cursor
+
+        if cursor is None:
+            cursor = current_cursor(db)
+            orders = db.query(Order).filter(Order.status.in_(ACTIVE_STATUSES)).all()
+            with self._lock:
+                self._orders = {order.id: order_payload(order) for order in orders}
+                self._cursor = cursor
+            return
+
+        changes = get_changes(db, Order, cursor)
+        if changes["cursor"] == cursor:
+            return
+        payloads = [order_payload(order) for order in changes["changed"]]
+        for payload in payloads:
+            self.apply(payload)
+        for order_id in changes["deleted"]:
+            self.remove(order_id)
+        with self._lock:
+            self._cursor = max(self._cursor or 0, changes["cursor"])
+
+    def snapshot(self, db: Session) -> List[dict]:
+        """Active orders, oldest first"""
+        self.refresh(db)
+        with self._lock:
+            return [self._orders[order_id] for order_id in sorted(self._orders)]
+
+
+active_orders = ActiveOrdersBoard()
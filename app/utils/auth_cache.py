@@ -0,0 +1,106 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from app.config import settings
+
+
+def token_hash(token: str) -> str:
+    """Cache key for a token; the raw token is never kept in memory"""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class ClaimsCache:
+    """Bounded LRU of already verified JWT claims keyed by token hash.
+
+    A hit skips signature verification entirely. Entries are dropped once
+    the token's ``exp`` passes, so a cached token never outlives its
+    signature; revocation is checked separately on every request.
+    """
+
+    def __init__(self, max_size: int = 4096):
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, dict] = OrderedDict()
+        self._max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            claims = self._entries.get(key)
+            if claims is not None and claims["exp"] <= time.time():
+                del self._entries[key]
+                claims = None
+            if claims is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return claims
+
+    def peek(self, key: str) -> Optional[dict]:
+        """Claims of a cached token without touching the LRU order or counters"""
+        with self._lock:
+            claims = self._entries.get(key)
+        return claims if claims is not None and claims["exp"] > time.time() else None
+
+    def put(self, key: str, claims: dict) -> None:
+        with self._lock:
+            self._entries[key] = claims
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class TokenDenyList:
+    """Revoked tokens and users, kept only until the tokens would expire anyway.
+
+    A single token is revoked on logout. Revoking a user rejects every token
+    issued to them before that moment (deactivation, password change).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # token hash -> exp
+        self._tokens: dict[str, float] = {}
+        # user id -> момент отзыва
+        self._users: dict[int, float] = {}
+
+    def _prune(self, now: float) -> None:
+        self._tokens = {key: exp for key, exp in self._tokens.items() if exp > now}
+        oldest = now - settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+        self._users = {user_id: at for user_id, at in self._users.items() if at > oldest}
+
+    def revoke_token(self, key: str, exp: float) -> None:
+        now = time.time()
+        with self._lock:
+            self._prune(now)
+            self._tokens[key] = exp
+
+    def revoke_user(self, user_id: int) -> None:
+        now = time.time()
+        with self._lock:
+            self._prune(now)
+            self._users[user_id] = now
+
+    def is_revoked(self, key: str, claims: dict) -> bool:
+        if key in self._tokens:
+            return True
+        revoked_at = self._users.get(claims["user_id"])
+        return revoked_at is not None and claims.get("iat", 0) <= revoked_at
+
+    def __len__(self) -> int:
+        return len(self._tokens) + len(self._users)
+
+
+claims_cache = ClaimsCache()
+token_deny_list = TokenDenyList()
@@ -0,0 +1,164 @@
+from typing import Iterable, Optional
+
+from fastapi import Request, Response
+from sqlalchemy import event, func, insert, select, text, true, update
+from sqlalchemy.orm import Session
+
+from app.models.change_log import ChangeLog
+from app.models.menu import MenuItem
+from app.models.order import Order
+from app.models.table import RestaurantTable
+
+# Сущности, изменения которых попадают в журнал, и их имена в журнале
+TRACKED_ENTITIES = {
+    Order: "orders",
+    RestaurantTable: "tables",
+    MenuItem: "menu",
+}
+
+UPSERT = "upsert"
+DELETE = "delete"
+
+# Ключ рекомендательной блокировки PostgreSQL, под которой транзакции
+# по очереди получают номера своих записей журнала
+JOURNAL_LOCK_KEY = 7_310_001
+# id записей журнала текущей транзакции PostgreSQL
+_JOURNAL_IDS = "change_log_ids"
+
+
+def _append(session: Session, rows: list[dict]) -> None:
+    connection = session.connection()
+    if connection.dialect.name != "postgresql":
+        # SQLite выполняет записи по одной, порядок id совпадает с порядком COMMIT
+        connection.execute(insert(ChangeLog), rows)
+        return
+    ids = connection.execute(insert(ChangeLog).returning(ChangeLog.id), rows).scalars().all()
+    session.info.setdefault(_JOURNAL_IDS, []).extend(ids)
+
+
+def record_changes(db: Session, entity: str, entity_ids: Iterable[int], operation: str = UPSERT) -> None:
+    """Append journal rows for writes done with set-based statements"""
+    rows = [
+        {"entity": entity, "entity_id": entity_id, "operation": operation}
+        for entity_id in entity_ids
+    ]
+    if rows:
+        _append(db, rows)
+
+
+@event.listens_for(Session, "after_flush")
+def _journal_flushed_changes(session, flush_context):
+    """Record every ORM write to a tracked entity in the same transaction.
+
+    Hooking the session instead of the routes also covers the SQLAdmin views.
+    """
+    dirty = [obj for obj in session.dirty if session.is_modified(obj)]
+
+    rows = []
+    for objects, operation in (
+        (session.new, UPSERT),
+        (dirty, UPSERT),
+        (session.deleted, DELETE),
+    ):
+        for obj in objects:
+            entity = TRACKED_ENTITIES.get(type(obj))
+            if entity is not None:
+                rows.append({"entity": entity, "entity_id": obj.id, "operation": operation})
+
+    if rows:
+        _append(session, rows)
+
+
+@event.listens_for(Session, "before_commit")
+def _renumber_journal(session):
+    """Give the journal rows of a PostgreSQL transaction ids in commit order.
+
+    The sequence hands out ids at INSERT, so with concurrent writers id 101
+    could become visible before id 100 and a reader that already moved its
+    cursor to 101 would never see 100. Right before COMMIT the rows get
+    fresh ids under a transaction-level advisory lock, which is held until
+    the commit is visible. Only this UPDATE and the COMMIT run under the
+    lock, so it cannot deadlock with row locks of other writers. Ids of rows
+    removed by a rolled back SAVEPOINT simply match nothing.
+    """
+    if session.in_nested_transaction():
+        # RELEASE SAVEPOINT: номера выдаются при COMMIT всей транзакции
+        return
+    # Записи, сделанные при flush внутри commit, тоже должны быть перенумерованы
+    session.flush()
+    ids = session.info.pop(_JOURNAL_IDS, None)
+    if not ids:
+        return
+    connection = session.connection()
+    connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": JOURNAL_LOCK_KEY})
+    connection.execute(
+        update(ChangeLog)
+        .where(ChangeLog.id.in_(ids))
+        .values(id=func.nextval(func.pg_get_serial_sequence(ChangeLog.__tablename__, "id"))),
+        execution_options={"synchronize_session": False},
+    )
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _forget_journal(session, transaction):
+    if transaction.parent is None:
+        session.info.pop(_JOURNAL_IDS, None)
+
+
+def current_cursor(db: Session) -> int:
+    return db.query(func.max(ChangeLog.id)).scalar() or 0
+
+
+def entity_etag(db: Session, *entities: str) -> str:
+    """Strong ETag that changes whenever any row of the entities changes"""
+    seq = db.query(func.max(ChangeLog.id)).filter(ChangeLog.entity.in_(entities)).scalar() or 0
+    return f'"{"-".join(entities)}-{seq}"'
+
+
+def not_modified(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """Set the ETag header and return a 304 response if the client is up to date"""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return None
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    if "*" in tags or etag in tags:
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+    return None
+
+
+def get_changes(db: Session, model, since: Optional[int]) -> dict:
+    """Rows of ``model`` written after ``since`` plus tombstones for deleted ids.
+
+    Without a cursor every current row is returned together with the cursor
+    to continue from. With a cursor only the journal tail is read, so the
+    cost depends on the number of changes and not on the table size.
+
+    The journal and the rows are read by a single statement, so the cursor
+    describes exactly the rows returned even under READ COMMITTED.
+    """
+    entity = TRACKED_ENTITIES[model]
+
+    if since is None:
+        # Курсор - однострочный подзапрос; LEFT JOIN оставляет его и при пустой таблице
+        journal = select(func.coalesce(func.max(ChangeLog.id), 0).label("cursor")).subquery()
+        rows = db.query(journal.c.cursor, model).select_from(journal).outerjoin(model, true()).all()
+        return {"cursor": rows[0].cursor, "changed": [row[1] for row in rows if row[1] is not None], "deleted": []}
+
+    tail = (
+        select(ChangeLog.entity_id, func.max(ChangeLog.id).label("seq"))
+        .where(ChangeLog.entity == entity, ChangeLog.id > since)
+        .group_by(ChangeLog.entity_id)
+        .subquery()
+    )
+    # Строки без пары в таблице удалены
+    rows = db.query(tail.c.entity_id, tail.c.seq, model).outerjoin(model, model.id == tail.c.entity_id).all()
+    if not rows:
+        return {"cursor": since, "changed": [], "deleted": []}
+
+    cursor = max(row.seq for row in rows)
+    changed = [row[2] for row in rows if row[2] is not None]
+    deleted = sorted(row.entity_id for row in rows if row[2] is None)
+    return {"cursor": cursor, "changed": changed, "deleted": deleted}
@@ -0,0 +1,105 @@
+import gzip
+import threading
+from typing import Iterable, List, NamedTuple, Optional
+
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session
+
+from app.models.menu import MenuItem
+from app.schemes.menu import MenuItemResponse
+from app.utils.changes import entity_etag
+
+_menu_adapter = TypeAdapter(List[MenuItemResponse])
+
+
+class MenuEntry(NamedTuple):
+    name: str
+    price: float
+    category: str
+
+
+class EncodedMenu(NamedTuple):
+    etag: str
+    body: bytes
+    gzip_body: bytes
+
+
+class MenuSnapshot:
+    """In-process snapshot of menu names, prices and categories.
+
+    Entries are loaded on demand with a single IN query and belong to the
+    menu position in the change journal, like the encoded menu: a write made
+    by another worker or outside the menu routes moves that position and the
+    next lookup starts from an empty snapshot. Writes in this process also
+    drop it at once. The version counter makes sure a lookup that raced with
+    a write never stores prices read before that write.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = 0
+        self._items: dict[int, MenuEntry] = {}
+        # Позиция меню в журнале, к которой относятся _items
+        self._items_etag: Optional[str] = None
+        self._encoded: Optional[EncodedMenu] = None
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._version += 1
+            self._items.clear()
+            self._items_etag = None
+            self._encoded = None
+
+    def get_many(self, db: Session, item_ids: Iterable[int]) -> dict[int, MenuEntry]:
+        """Return entries for the requested ids; unknown ids are absent"""
+        wanted = set(item_ids)
+        etag = entity_etag(db, "menu")
+        with self._lock:
+            if self._items_etag != etag:
+                self._items.clear()
+                self._items_etag = etag
+            version = self._version
+            found = {item_id: self._items[item_id] for item_id in wanted if item_id in self._items}
+
+        missing = wanted - found.keys()
+        if missing:
+            rows = (
+                db.query(MenuItem.id, MenuItem.name, MenuItem.price, MenuItem.category)
+                .filter(MenuItem.id.in_(missing))
+                .all()
+            )
+            loaded = {row.id: MenuEntry(row.name, row.price, row.category) for row in rows}
+            with self._lock:
+                if self._version == version and self._items_etag == etag:
+                    self._items.update(loaded)
+            found.update(loaded)
+
+        return found
+
+    def encoded(self, db: Session) -> EncodedMenu:
+        """Full menu as ready-to-send JSON and gzip bytes.
+
+        The bytes are keyed by the menu position in the change journal, so
+        writes made by other workers or through SQLAdmin also rebuild them.
+        """
+        etag = entity_etag(db, "menu")
+        with self._lock:
+            version = self._version
+            encoded = self._encoded
+        if encoded and encoded.etag == etag:
+            return encoded
+
+        items = db.query(MenuItem).order_by(MenuItem.id).all()
+        body = _menu_adapter.dump_json(_menu_adapter.validate_python(items, from_attributes=True))
+        encoded = EncodedMenu(etag, body, gzip.compress(body, compresslevel=6))
+        with self._lock:
+            if self._version == version:
+                self._encoded = encoded
+        return encoded
+
+
+menu_snapshot = MenuSnapshot()
@@ -0,0 +1,91 @@
+import codecs
+import csv
+import io
+import json
+from typing import AsyncIterator, Iterable
+
+from app.schemes.menu import MenuItemCreate
+
+FORMATS = ("csv", "ndjson")
+MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+
+# Поля выгрузки совпадают с полями загрузки, поэтому файл можно загрузить обратно
+EXPORT_FIELDS = list(MenuItemCreate.model_fields)
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Split an incoming byte stream into text lines without buffering it whole"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+async def _csv_records(lines: AsyncIterator[str]) -> AsyncIterator[list[str]]:
+    # Поле в кавычках может содержать перевод строки: строки копятся,
+    # пока число кавычек не станет чётным
+    pending = ""
+    async for line in lines:
+        pending += line
+        if pending.count('"') % 2:
+            continue
+        if pending.strip():
+            yield next(csv.reader([pending]))
+        pending = ""
+    if pending.strip():
+        yield next(csv.reader([pending]))
+
+
+async def parse_rows(chunks: AsyncIterator[bytes], format: str) -> AsyncIterator[tuple[int, dict | str]]:
+    """Yield ``(row_number, data)`` pairs; ``data`` is an error message for unreadable rows"""
+    lines = iter_lines(chunks)
+
+    if format == "ndjson":
+        row_number = 0
+        async for line in lines:
+            row_number += 1
+            if not line.strip():
+                continue
+            try:
+                data = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield row_number, f"Invalid JSON: {e.msg}"
+                continue
+            yield row_number, data if isinstance(data, dict) else "Row must be a JSON object"
+        return
+
+    header = None
+    row_number = 1
+    async for record in _csv_records(lines):
+        if header is None:
+            header = [name.strip() for name in record]
+            continue
+        row_number += 1
+        if len(record) != len(header):
+            yield row_number, f"Expected {len(header)} columns, got {len(record)}"
+            continue
+        # Пустая ячейка означает значение по умолчанию
+        yield row_number, {name: value for name, value in zip(header, record) if value != ""}
+
+
+def to_csv(items: Iterable, header: bool = False) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(EXPORT_FIELDS)
+    for item in items:
+        writer.writerow(["" if getattr(item, field) is None else getattr(item, field) for field in EXPORT_FIELDS])
+    return buffer.getvalue().encode()
+
+
+def to_ndjson(items: Iterable) -> bytes:
+    return "".join(
+        json.dumps(item.model_dump(include=set(EXPORT_FIELDS)), ensure_ascii=False) + "\n"
+        for item in items
+    ).encode()
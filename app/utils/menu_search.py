@@ -0,0 +1,93 @@
+import re
+from typing import Optional
+
+from sqlalchemy import column, func, inspect, literal_column, table, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.models.menu import MenuItem
+
+# Индекс хранит только ссылки на строки menu_items (external content),
+# триггеры держат его в актуальном состоянии при любых записях
+FTS_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS menu_items_fts USING fts5(
+        name, description,
+        content='menu_items', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS menu_items_fts_ai AFTER INSERT ON menu_items BEGIN
+        INSERT INTO menu_items_fts(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS menu_items_fts_ad AFTER DELETE ON menu_items BEGIN
+        INSERT INTO menu_items_fts(menu_items_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS menu_items_fts_au AFTER UPDATE OF name, description ON menu_items BEGIN
+        INSERT INTO menu_items_fts(menu_items_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO menu_items_fts(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END""",
+]
+
+# Вес совпадения в названии относительно описания
+NAME_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+_fts = table("menu_items_fts", column("rowid"))
+_match = text("menu_items_fts MATCH :query")
+_rank = func.bm25(literal_column("menu_items_fts"), NAME_WEIGHT, DESCRIPTION_WEIGHT)
+
+
+def ensure_menu_search(connection: Connection) -> None:
+    """Create the FTS index for databases built with create_all instead of alembic"""
+    if connection.dialect.name != "sqlite":
+        return
+    exists = inspect(connection).has_table("menu_items_fts")
+    for statement in FTS_DDL:
+        connection.exec_driver_sql(statement)
+    if not exists:
+        connection.exec_driver_sql("INSERT INTO menu_items_fts(menu_items_fts) VALUES ('rebuild')")
+
+
+def fts_query(q: str) -> Optional[str]:
+    """Turn user input into an FTS5 query where every word is a prefix term"""
+    words = re.findall(r"\w+", q)
+    if not words:
+        return None
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def search_menu(db: Session, q: str, category: Optional[str], available: Optional[bool], limit: int) -> dict:
+    """Ranked matches plus per-category counts.
+
+    Counts ignore the category filter, so the client can show how many
+    matches every other category has.
+    """
+    query = fts_query(q)
+    base = db.query(MenuItem)
+    facets = db.query(MenuItem.category, func.count(MenuItem.id))
+    if query and db.bind.dialect.name == "sqlite":
+        base = base.join(_fts, _fts.c.rowid == MenuItem.id).filter(_match).params(query=query)
+        facets = facets.join(_fts, _fts.c.rowid == MenuItem.id).filter(_match).params(query=query)
+        order_by = [_rank, MenuItem.id]
+    elif query:
+        pattern = f"%{q.strip()}%"
+        condition = MenuItem.name.ilike(pattern) | MenuItem.description.ilike(pattern)
+        base = base.filter(condition)
+        facets = facets.filter(condition)
+        order_by = [MenuItem.name, MenuItem.id]
+    else:
+        order_by = [MenuItem.name, MenuItem.id]
+
+    if available is not None:
+        base = base.filter(MenuItem.is_available == available)
+        facets = facets.filter(MenuItem.is_available == available)
+    if category:
+        base = base.filter(MenuItem.category == category)
+
+    counts = facets.group_by(MenuItem.category).order_by(MenuItem.category).all()
+    return {
+        "items": base.order_by(*order_by).limit(limit).all(),
+        "facets": [{"category": name, "count": count} for name, count in counts],
+        "total": sum(count for name, count in counts if not category or name == category),
+    }
@@ -0,0 +1,65 @@
+from collections import Counter
+from typing import Iterable
+
+from sqlalchemy import and_, case, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.models.order import Order
+from app.models.table import RestaurantTable
+from app.utils.active_orders import ACTIVE_STATUSES
+from app.utils.changes import record_changes
+
+
+def adjust_open_orders(db: Session, table_ids: Iterable[int], delta: int) -> None:
+    """Add ``delta`` open orders to every table in ``table_ids`` (repeats add up).
+
+    One relative UPDATE in the caller's transaction, so concurrent order
+    writes never overwrite each other's counts. A table is occupied while it
+    has open orders and becomes free when the last one closes.
+    """
+    deltas = {table_id: count * delta for table_id, count in Counter(table_ids).items()}
+    if not deltas or not delta:
+        return
+
+    new_count = RestaurantTable.open_order_count + case(deltas, value=RestaurantTable.id)
+    db.execute(
+        update(RestaurantTable)
+        .where(RestaurantTable.id.in_(deltas))
+        .values(open_order_count=new_count, is_occupied=new_count > 0),
+        execution_options={"synchronize_session": False},
+    )
+    record_changes(db, "tables", deltas)
+
+
+def reconcile_occupancy(db: Session) -> list[dict]:
+    """Recount open orders for every table in one pass and fix the drifted ones"""
+    open_orders = (
+        select(func.count(Order.id))
+        .where(Order.table_id == RestaurantTable.id, Order.status.in_(ACTIVE_STATUSES))
+        .correlate(RestaurantTable)
+        .scalar_subquery()
+    )
+    drifted = db.execute(
+        select(RestaurantTable.id, RestaurantTable.open_order_count, open_orders.label("actual"))
+        .where(or_(
+            RestaurantTable.open_order_count != open_orders,
+            and_(open_orders > 0, RestaurantTable.is_occupied.is_not(True)),
+        ))
+    ).all()
+    if not drifted:
+        return []
+
+    counts = {row.id: row.actual for row in drifted}
+    new_count = case(counts, value=RestaurantTable.id)
+    db.execute(
+        update(RestaurantTable)
+        .where(RestaurantTable.id.in_(counts))
+        .values(open_order_count=new_count, is_occupied=new_count > 0),
+        execution_options={"synchronize_session": False},
+    )
+    record_changes(db, "tables", counts)
+    db.commit()
+    return [
+        {"table_id": row.id, "recorded": row.open_order_count, "actual": row.actual}
+        for row in drifted
+    ]
@@ -0,0 +1,123 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database.database import async_session_maker, async_session_maker_read, dialect_insert
+from app.models.archive import ArchivedOrder
+from app.models.order import Order, OrderItem
+from app.schemes.order import CLOSED_STATUSES, order_payload
+from app.utils.changes import DELETE, record_changes
+
+EXPORT_CHUNK_SIZE = 500
+
+
+def _archive_row(order: Order) -> dict:
+    return {
+        "id": order.id,
+        "table_id": order.table_id,
+        "status": order.status,
+        "total_price": order.total_price,
+        "waiter_id": order.waiter_id,
+        "version": order.version,
+        "items": [
+            {
+                "menu_item_id": line.menu_item_id,
+                "name": line.name,
+                "quantity": line.quantity,
+                "price": line.price,
+                "category": line.category,
+            }
+            for line in order.items
+        ],
+        "created_at": order.created_at,
+        "updated_at": order.updated_at,
+    }
+
+
+def archive_batch(db: Session, cutoff: datetime, batch_size: int) -> int:
+    """Move up to ``batch_size`` closed orders placed before ``cutoff`` and commit"""
+    already_archived = select(ArchivedOrder.id).where(ArchivedOrder.id == Order.id).exists()
+    orders = db.execute(
+        select(Order)
+        .where(Order.status.in_(CLOSED_STATUSES), Order.created_at < cutoff, ~already_archived)
+        .order_by(Order.id)
+        .limit(batch_size)
+    ).scalars().all()
+    if not orders:
+        return 0
+
+    # Удаляются только заказы, которые действительно легли в архив: строку
+    # с уже занятым id пропускает DO NOTHING, и заказ остаётся в orders
+    ids = list(db.execute(
+        dialect_insert(db, ArchivedOrder).on_conflict_do_nothing().returning(ArchivedOrder.id),
+        [_archive_row(order) for order in orders],
+    ).scalars().all())
+    if ids:
+        db.execute(delete(OrderItem).where(OrderItem.order_id.in_(ids)))
+        db.execute(delete(Order).where(Order.id.in_(ids)), execution_options={"synchronize_session": False})
+        record_changes(db, "orders", ids, DELETE)
+    db.commit()
+    return len(ids)
+
+
+async def archive_orders(older_than_days: Optional[int] = None, batch_size: Optional[int] = None) -> int:
+    """Move completed and cancelled orders older than the cutoff into orders_archive.
+
+    Every batch is its own short transaction, so the SQLite write lock is
+    released between batches and order entry keeps working while a large
+    backlog is archived. Returns the number of archived orders.
+    """
+    days = settings.ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+    batch_size = batch_size or settings.ARCHIVE_BATCH_SIZE
+    cutoff = datetime.utcnow() - timedelta(days=days)
+
+    total = 0
+    while True:
+        async with async_session_maker() as session:
+            moved = await session.run_sync(archive_batch, cutoff, batch_size)
+        if not moved:
+            return total
+        total += moved
+
+
+async def run_archive_schedule() -> None:
+    """Run the archival job every ARCHIVE_INTERVAL_MINUTES until cancelled"""
+    while True:
+        await asyncio.sleep(settings.ARCHIVE_INTERVAL_MINUTES * 60)
+        try:
+            archived = await archive_orders()
+            if archived:
+                print(f"Archived {archived} orders")
+        except Exception as e:
+            print(f"Error archiving orders: {str(e)}")
+
+
+async def _export_chunks(model, archived: bool) -> AsyncIterator[list]:
+    last_id = 0
+    while True:
+        # Отдельная короткая сессия на каждую порцию: долгий экспорт не
+        # держит открытую транзакцию чтения и не мешает записи
+        async with async_session_maker_read() as session:
+            rows = (await session.execute(
+                select(model).where(model.id > last_id).order_by(model.id).limit(EXPORT_CHUNK_SIZE)
+            )).scalars().all()
+            payloads = [{**order_payload(row), "archived": archived} for row in rows]
+        if not payloads:
+            return
+        yield payloads
+        last_id = payloads[-1]["id"]
+
+
+async def export_orders_ndjson(include_archived: bool = True) -> AsyncIterator[bytes]:
+    """Live orders followed by archived ones, one JSON document per line"""
+    sources = [(Order, False)]
+    if include_archived:
+        sources.append((ArchivedOrder, True))
+    for model, archived in sources:
+        async for payloads in _export_chunks(model, archived):
+            yield "".join(json.dumps(payload, ensure_ascii=False) + "\n" for payload in payloads).encode()
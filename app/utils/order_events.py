@@ -0,0 +1,102 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class OrderEvent:
+    seq: int
+    type: str
+    data: dict
+
+
+class OrderSubscription:
+    """Queue of events for one connected client"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, max_pending: int):
+        self.loop = loop
+        self.queue: asyncio.Queue[OrderEvent] = asyncio.Queue(maxsize=max_pending)
+        self.overflowed = False
+
+    def deliver(self, event: OrderEvent) -> None:
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Клиент не успевает читать: закрываем поток, при переподключении
+            # он получит пропущенные события из истории или новый снимок
+            self.overflowed = True
+
+
+class OrderEventBroker:
+    """In-process fan-out of committed order changes to stream subscribers.
+
+    Publishing is thread-safe, so sync routes running in the threadpool can
+    publish directly. The last events are kept in a ring buffer so a client
+    reconnecting with its last event id only receives what it missed.
+    """
+
+    def __init__(self, history_size: int = 1000, max_pending: int = 500):
+        self._lock = threading.Lock()
+        self._history: deque[OrderEvent] = deque(maxlen=history_size)
+        self._subscribers: set[OrderSubscription] = set()
+        self._max_pending = max_pending
+        self._seq = 0
+        # Идентификаторы событий уникальны только в рамках процесса, поэтому
+        # к ним добавляется эпоха: после рестарта старые id не совпадут
+        self.epoch = format(time.time_ns(), "x")
+
+    def event_id(self, seq: int) -> str:
+        return f"{self.epoch}-{seq}"
+
+    def parse_event_id(self, event_id: str | None) -> int | None:
+        """Return the sequence number of an event id issued by this process"""
+        if not event_id:
+            return None
+        epoch, _, seq = event_id.rpartition("-")
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        return int(seq)
+
+    def publish(self, event_type: str, data: dict) -> OrderEvent:
+        with self._lock:
+            self._seq += 1
+            event = OrderEvent(self._seq, event_type, data)
+            self._history.append(event)
+            subscribers = list(self._subscribers)
+
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, event)
+            except RuntimeError:
+                # Цикл событий подписчика уже закрыт
+                self.unsubscribe(subscription)
+        return event
+
+    def subscribe(
+        self, last_seq: int | None = None
+    ) -> tuple[OrderSubscription, int, list[OrderEvent] | None]:
+        """Register a subscriber.
+
+        Returns the subscription, the sequence number it starts from and the
+        events missed since ``last_seq``. The backlog is ``None`` when the
+        client has to start over from a snapshot.
+        """
+        subscription = OrderSubscription(asyncio.get_running_loop(), self._max_pending)
+        with self._lock:
+            self._subscribers.add(subscription)
+            current = self._seq
+            backlog = None
+            if last_seq is not None and last_seq <= current:
+                oldest = self._history[0].seq if self._history else current + 1
+                if last_seq >= oldest - 1:
+                    backlog = [event for event in self._history if event.seq > last_seq]
+        return subscription, current, backlog
+
+    def unsubscribe(self, subscription: OrderSubscription) -> None:
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+
+order_events = OrderEventBroker()
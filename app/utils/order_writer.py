@@ -0,0 +1,197 @@
+import asyncio
+import functools
+import itertools
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database.database import async_session_maker
+from app.utils.active_orders import active_orders
+from app.utils.order_events import order_events
+from app.utils.timing import timing_summary
+
+# Операция записи получает сессию пачки и аргументы всех своих запросов
+# подряд, а возвращает по исходу на запрос: исключение или пару из результата
+# и событий ("created"/"updated"/"deleted", payload) для рассылки
+OrderWrite = Callable[[Session, list[tuple]], list]
+
+
+def one_by_one(operation: Callable[..., tuple[Any, list]]) -> OrderWrite:
+    """Turn ``operation(db, *args) -> (result, events)`` into an OrderWrite.
+
+    Each write runs in its own SAVEPOINT, so a failed one is rolled back
+    alone and the others of the batch still commit.
+    """
+    @functools.wraps(operation)
+    def apply(db: Session, writes: list[tuple]) -> list:
+        outcomes = []
+        for args in writes:
+            try:
+                with db.begin_nested():
+                    outcomes.append(operation(db, *args))
+            except Exception as e:
+                outcomes.append(e)
+            # Следующая запись читает строки заново, а не из identity map
+            db.expunge_all()
+        return outcomes
+
+    return apply
+
+
+@dataclass
+class _PendingWrite:
+    operation: OrderWrite
+    args: tuple
+    future: asyncio.Future
+    queued_at: float
+
+
+class OrderWriter:
+    """Single-writer pipeline for order inserts and status changes.
+
+    One asyncio task takes queued writes, waits up to ORDER_WRITE_WINDOW_MS
+    for more, and applies the whole batch in one transaction on the write
+    connection: one BEGIN IMMEDIATE and one COMMIT instead of one per
+    request. Consecutive writes of the same operation are handed to it
+    together, so order inserts become a few set-based statements for the
+    whole run. Every request gets its own outcome; events are published
+    only after the commit.
+    """
+
+    def __init__(self, window_ms: int, max_batch: int, history_size: int = 1000):
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._lock = threading.Lock()
+        self._batches = 0
+        self._writes = 0
+        self._failed = 0
+        self._batch_sizes: deque[int] = deque(maxlen=history_size)
+        self._wait_times: deque[float] = deque(maxlen=history_size)
+        self._commit_times: deque[float] = deque(maxlen=history_size)
+
+    def start(self) -> None:
+        # Очередь и задача привязаны к циклу событий, в котором созданы
+        if self._task is None or self._task.done() or self._task.get_loop() is not asyncio.get_running_loop():
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Finish queued writes and stop the task"""
+        if self._task is None or self._task.get_loop() is not asyncio.get_running_loop():
+            return
+        await self._queue.join()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def submit(self, operation: OrderWrite, *args) -> Any:
+        """Queue a write and wait until its batch is committed; returns its result or raises its error"""
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(_PendingWrite(operation, args, future, time.perf_counter()))
+        return await future
+
+    async def _collect(self) -> list[_PendingWrite]:
+        batch = [await self._queue.get()]
+        deadline = time.perf_counter() + self.window
+        while len(batch) < self.max_batch:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect()
+            try:
+                await self._apply(batch)
+            except Exception as e:
+                # Общая ошибка пачки (например, сбой COMMIT) достаётся всем её запросам
+                for write in batch:
+                    if not write.future.done():
+                        write.future.set_exception(e)
+                with self._lock:
+                    self._failed += len(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _apply(self, batch: list[_PendingWrite]) -> None:
+        started = time.perf_counter()
+        outcomes = []
+        async with async_session_maker() as session:
+            for operation, run in itertools.groupby(batch, key=lambda write: write.operation):
+                writes = [write for write in run if not write.future.cancelled()]
+                if not writes:
+                    continue
+                try:
+                    # Сбой операции целиком откатывает только её записи
+                    async with session.begin_nested():
+                        results = await session.run_sync(operation, [write.args for write in writes])
+                except Exception as e:
+                    results = [e] * len(writes)
+                session.expunge_all()
+                outcomes.extend(zip(writes, results))
+            await session.commit()
+        committed = time.perf_counter()
+
+        failed = 0
+        for write, outcome in outcomes:
+            if isinstance(outcome, Exception):
+                failed += 1
+                if not write.future.done():
+                    write.future.set_exception(outcome)
+                continue
+            result, events = outcome
+            for event_type, payload in events:
+                if event_type == "deleted":
+                    active_orders.remove(payload["id"])
+                else:
+                    active_orders.apply(payload)
+                order_events.publish(event_type, payload)
+            if not write.future.done():
+                write.future.set_result(result)
+
+        with self._lock:
+            self._batches += 1
+            self._writes += len(outcomes) - failed
+            self._failed += failed
+            self._batch_sizes.append(len(batch))
+            self._commit_times.append(committed - started)
+            self._wait_times.extend(started - write.queued_at for write in batch)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            sizes = list(self._batch_sizes)
+            return {
+                "window_ms": round(self.window * 1000, 2),
+                "max_batch": self.max_batch,
+                "queued": self._queue.qsize() if self._queue else 0,
+                "batches": self._batches,
+                "writes": self._writes,
+                "failed": self._failed,
+                "avg_batch": round(sum(sizes) / len(sizes), 2) if sizes else 0.0,
+                "largest_batch": max(sizes, default=0),
+                "wait": timing_summary(self._wait_times),
+                "commit": timing_summary(self._commit_times),
+            }
+
+
+order_writer = OrderWriter(settings.ORDER_WRITE_WINDOW_MS, settings.ORDER_WRITE_MAX_BATCH)
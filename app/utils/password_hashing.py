@@ -0,0 +1,225 @@
+import asyncio
+import math
+import multiprocessing
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from typing import Optional
+
+from passlib.context import CryptContext
+
+from app.config import settings
+from app.exceptions.auth import HashingOverloadedError
+from app.utils.timing import timing_summary
+
+# Границы подбора: ниже 10 bcrypt слишком дёшев для перебора, выше 16 - секунды на вход
+MIN_ROUNDS = 10
+MAX_ROUNDS = 16
+
+
+@lru_cache(maxsize=None)
+def _context(rounds: int) -> CryptContext:
+    # Хэши слабее rounds обновляются при входе; более сильные остаются как есть,
+    # чтобы разброс замера между запусками не перехэшировал всех заново
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=31,
+    )
+
+
+# Выполняются в процессах пула; возвращают результат и время самого bcrypt
+def _hash(password: str, rounds: int) -> tuple[str, float]:
+    started = time.perf_counter()
+    return _context(rounds).hash(password), time.perf_counter() - started
+
+
+def _verify_and_update(password: str, password_hash: str, rounds: int) -> tuple[tuple[bool, Optional[str]], float]:
+    started = time.perf_counter()
+    return _context(rounds).verify_and_update(password, password_hash), time.perf_counter() - started
+
+
+def _warm_up(rounds: int) -> None:
+    _context(rounds)
+
+
+def _benchmark(target_ms: int) -> int:
+    """Highest cost whose hash stays within ``target_ms`` on this machine"""
+    context = _context(MIN_ROUNDS)
+    samples = []
+    for _ in range(3):
+        started = time.perf_counter()
+        context.hash("benchmark")
+        samples.append(time.perf_counter() - started)
+    # Каждый следующий раунд удваивает время хэширования
+    extra = math.floor(math.log2(target_ms / 1000 / min(samples)))
+    return max(MIN_ROUNDS, min(MAX_ROUNDS, MIN_ROUNDS + extra))
+
+
+class PasswordHasher:
+    """The one bcrypt service of the app, on a dedicated process pool.
+
+    bcrypt holds a core for ~250 ms, so running it on the default threadpool
+    or in the event loop stalls every other request during a login burst.
+    At most ``workers`` hashes run at once and ``max_queue`` more may wait;
+    anything beyond that fails fast with HashingOverloadedError (503), which
+    keeps the number of blocked request threads bounded.
+
+    The cost factor comes from BCRYPT_ROUNDS or, if unset, from a benchmark
+    in a pool process at startup against ``target_ms``. Every worker is
+    started at startup too, so the first logins do not pay for the spawn.
+
+    If a worker dies (OOM kill, segfault) the pool is broken for good, so it
+    is replaced with a new one and the hash is retried once; a second
+    failure is reported as HashingOverloadedError.
+    """
+
+    def __init__(self, workers: int, max_queue: int, rounds: Optional[int], target_ms: int, history_size: int = 1000):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.rounds = rounds
+        self.rounds_source = "config" if rounds else None
+        self.target_ms = target_ms
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+        self._failed = 0
+        self._restarts = 0
+        self._wait_times: deque[float] = deque(maxlen=history_size)
+        self._hash_times: deque[float] = deque(maxlen=history_size)
+
+    def start(self) -> None:
+        with self._start_lock:
+            if self._executor is not None:
+                return
+            # spawn: fork из процесса с потоками uvicorn небезопасен
+            executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+            if self.rounds is None:
+                self.rounds = executor.submit(_benchmark, self.target_ms).result()
+                self.rounds_source = "benchmark"
+            # Процессы spawn стартуют и импортируют passlib по секунде и дольше;
+            # пусть это случится до первого входа, а не во время него
+            for future in [executor.submit(_warm_up, self.rounds) for _ in range(self.workers)]:
+                future.result()
+            with self._lock:
+                self._executor = executor
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _discard(self, executor: ProcessPoolExecutor) -> None:
+        """Drop a broken pool; the next submit starts a new one"""
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+            self._restarts += 1
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, fn, *args) -> Future:
+        with self._lock:
+            if self._in_flight >= self.workers + self.max_queue:
+                self._rejected += 1
+                raise HashingOverloadedError
+            self._in_flight += 1
+        submitted = time.perf_counter()
+        try:
+            for attempt in range(2):
+                if self._executor is None:
+                    self.start()
+                with self._lock:
+                    executor = self._executor
+                try:
+                    future = executor.submit(fn, *args, self.rounds)
+                    break
+                except BrokenProcessPool:
+                    self._discard(executor)
+                    if attempt:
+                        raise
+        except Exception:
+            with self._lock:
+                self._in_flight -= 1
+            raise
+        future.add_done_callback(lambda done: self._finished(done, executor, submitted))
+        return future
+
+    def _finished(self, future: Future, executor: ProcessPoolExecutor, submitted: float) -> None:
+        elapsed = time.perf_counter() - submitted
+        if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+            self._discard(executor)
+        with self._lock:
+            self._in_flight -= 1
+            if future.cancelled() or future.exception() is not None:
+                self._failed += 1
+                return
+            _, hash_time = future.result()
+            self._completed += 1
+            self._hash_times.append(hash_time)
+            # Всё, кроме самого bcrypt: очередь пула и передача между процессами
+            self._wait_times.append(max(elapsed - hash_time, 0.0))
+
+    def _call(self, fn, *args):
+        try:
+            return self._submit(fn, *args).result()[0]
+        except BrokenProcessPool:
+            # Процесс пула умер посреди хэша: один повтор уже на новом пуле
+            try:
+                return self._submit(fn, *args).result()[0]
+            except BrokenProcessPool as exc:
+                raise HashingOverloadedError from exc
+
+    async def _call_async(self, fn, *args):
+        try:
+            return (await asyncio.wrap_future(self._submit(fn, *args)))[0]
+        except BrokenProcessPool:
+            try:
+                return (await asyncio.wrap_future(self._submit(fn, *args)))[0]
+            except BrokenProcessPool as exc:
+                raise HashingOverloadedError from exc
+
+    def hash(self, password: str) -> str:
+        return self._call(_hash, password)
+
+    def verify_and_update(self, password: str, password_hash: str) -> tuple[bool, Optional[str]]:
+        """Check the password; the second item is a new hash if the stored one is too weak"""
+        return self._call(_verify_and_update, password, password_hash)
+
+    async def hash_async(self, password: str) -> str:
+        return await self._call_async(_hash, password)
+
+    async def verify_and_update_async(self, password: str, password_hash: str) -> tuple[bool, Optional[str]]:
+        return await self._call_async(_verify_and_update, password, password_hash)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "rounds": self.rounds,
+                "rounds_source": self.rounds_source,
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "in_flight": self._in_flight,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "failed": self._failed,
+                "restarts": self._restarts,
+                "wait": timing_summary(self._wait_times),
+                "hash": timing_summary(self._hash_times),
+            }
+
+
+password_hasher = PasswordHasher(
+    settings.HASH_WORKERS, settings.HASH_MAX_QUEUE, settings.BCRYPT_ROUNDS, settings.HASH_TARGET_MS
+)
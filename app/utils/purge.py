@@ -0,0 +1,208 @@
+import logging
+import threading
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Optional
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database.database import async_session_maker
+from app.models.menu import MenuItem
+from app.models.order import Order
+from app.models.table import RestaurantTable
+from app.schemes.order import CLOSED_STATUSES
+from app.utils.active_orders import active_orders
+from app.utils.changes import DELETE, record_changes
+from app.utils.menu_cache import menu_snapshot
+from app.utils.occupancy import adjust_open_orders
+from app.utils.order_events import order_events
+from app.utils.sales_rollups import record_status_changes
+
+logger = logging.getLogger(__name__)
+
+# Шаг удаления: удаляет одну порцию, фиксирует транзакцию и возвращает
+# (число удалённых строк, закончено ли удаление)
+PurgeStep = Callable[[Session, int], tuple[int, bool]]
+
+
+def _set_accepts_orders(db: Session, table_id: int, accepts_orders: bool) -> None:
+    ids = db.execute(
+        update(RestaurantTable)
+        .where(RestaurantTable.id == table_id)
+        .values(accepts_orders=accepts_orders)
+        .returning(RestaurantTable.id),
+        execution_options={"synchronize_session": False},
+    ).scalars().all()
+    record_changes(db, "tables", ids)
+    db.commit()
+
+
+def close_table(db: Session, table_id: int) -> None:
+    """Stop taking orders for a table before its purge starts and commit"""
+    _set_accepts_orders(db, table_id, False)
+
+
+def reopen_table(db: Session, table_id: int) -> None:
+    """Take orders for the table again after its purge failed"""
+    _set_accepts_orders(db, table_id, True)
+
+
+def purge_table_step(table_id: int) -> PurgeStep:
+    """Delete the next chunk of the table's orders, and the table itself with the last one.
+
+    The table must be closed with ``close_table`` first, so no order can
+    appear between chunks and the last chunk deletes every remaining order
+    through the journal and the rollups before the table row goes.
+    """
+
+    def step(db: Session, chunk_size: int) -> tuple[int, bool]:
+        # Заказ, принятый до закрытия стола, держит FOR KEY SHARE на строке
+        # стола до своего COMMIT: порция дожидается его и видит этот заказ.
+        # У SQLite записи и так идут по одной
+        db.execute(select(RestaurantTable.id).where(RestaurantTable.id == table_id).with_for_update())
+        orders = db.execute(
+            select(Order).where(Order.table_id == table_id).order_by(Order.id).limit(chunk_size)
+        ).scalars().all()
+        ids = [order.id for order in orders]
+        done = len(ids) < chunk_size
+
+        # Удалённые заказы больше не учитываются в аналитике
+        record_status_changes(db, [(order, order.status, None) for order in orders])
+        if ids:
+            # Позиции заказов удаляет ON DELETE CASCADE
+            db.execute(delete(Order).where(Order.id.in_(ids)), execution_options={"synchronize_session": False})
+            record_changes(db, "orders", ids, DELETE)
+        if done:
+            db.execute(
+                delete(RestaurantTable).where(RestaurantTable.id == table_id),
+                execution_options={"synchronize_session": False},
+            )
+            record_changes(db, "tables", [table_id], DELETE)
+        else:
+            # Стол ещё виден официантам, пока фоновая задача не дойдёт до конца
+            adjust_open_orders(db, [order.table_id for order in orders if order.status not in CLOSED_STATUSES], -1)
+        db.commit()
+
+        for order_id in ids:
+            active_orders.remove(order_id)
+            order_events.publish("deleted", {"id": order_id})
+        return len(ids) + done, done
+
+    return step
+
+
+def purge_category_step(category: str) -> PurgeStep:
+    """Delete the next chunk of menu items in the category"""
+
+    def step(db: Session, chunk_size: int) -> tuple[int, bool]:
+        ids = db.execute(
+            select(MenuItem.id).where(MenuItem.category == category).order_by(MenuItem.id).limit(chunk_size)
+        ).scalars().all()
+        if ids:
+            # Позиции заказов хранят снимок блюда, поэтому удалять больше нечего
+            db.execute(delete(MenuItem).where(MenuItem.id.in_(ids)), execution_options={"synchronize_session": False})
+            record_changes(db, "menu", ids, DELETE)
+            db.commit()
+            menu_snapshot.invalidate()
+        return len(ids), len(ids) < chunk_size
+
+    return step
+
+
+def count_table_rows(db: Session, table_id: int) -> int:
+    """Rows a table purge deletes: its orders plus the table itself"""
+    return db.query(func.count(Order.id)).filter(Order.table_id == table_id).scalar() + 1
+
+
+def count_category_rows(db: Session, category: str) -> int:
+    return db.query(func.count(MenuItem.id)).filter(MenuItem.category == category).scalar()
+
+
+def run_purge(db: Session, step: PurgeStep, chunk_size: Optional[int] = None, on_progress=None) -> int:
+    """Run ``step`` until it is done; every chunk is its own short transaction"""
+    chunk_size = chunk_size or settings.PURGE_CHUNK_SIZE
+    total = 0
+    while True:
+        deleted, done = step(db, chunk_size)
+        total += deleted
+        if on_progress:
+            on_progress(total)
+        if done:
+            return total
+
+
+@dataclass
+class PurgeJob:
+    id: str
+    kind: str
+    target: str
+    total: int
+    status: str = "pending"
+    deleted: int = 0
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    finished_at: Optional[datetime] = None
+
+
+class PurgeJobs:
+    """In-process registry of background purges and their progress.
+
+    Only one job per target runs at a time; finished jobs are kept until
+    ``history_size`` newer jobs push them out.
+    """
+
+    def __init__(self, history_size: int = 100):
+        self._lock = threading.Lock()
+        self._jobs: OrderedDict[str, PurgeJob] = OrderedDict()
+        self._history_size = history_size
+
+    def submit(self, kind: str, target, total: int) -> tuple[PurgeJob, bool]:
+        """Register a job, or return the running one for the same target"""
+        with self._lock:
+            for job in self._jobs.values():
+                if job.kind == kind and job.target == str(target) and job.finished_at is None:
+                    return job, False
+            job = PurgeJob(id=uuid.uuid4().hex, kind=kind, target=str(target), total=total)
+            self._jobs[job.id] = job
+            while len(self._jobs) > self._history_size:
+                self._jobs.popitem(last=False)
+            return job, True
+
+    def get(self, job_id: str) -> Optional[PurgeJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self) -> list[PurgeJob]:
+        with self._lock:
+            return list(reversed(self._jobs.values()))
+
+    async def run(self, job: PurgeJob, step: PurgeStep, on_error: Optional[Callable[[Session], None]] = None) -> None:
+        """Execute the job; meant to run as a background task after the response.
+
+        ``on_error`` runs in a fresh transaction if the job fails, to undo
+        what was done before the first chunk (e.g. reopen the table).
+        """
+        def progress(deleted: int) -> None:
+            job.deleted = deleted
+
+        job.status = "running"
+        async with async_session_maker() as session:
+            try:
+                await session.run_sync(run_purge, step, None, progress)
+                job.status = "completed"
+            except Exception as e:
+                await session.rollback()
+                job.status = "failed"
+                job.error = str(e)
+                logger.exception("Purge job %s failed", job.id)
+                if on_error:
+                    await session.run_sync(on_error)
+            finally:
+                job.finished_at = datetime.utcnow()
+
+
+purge_jobs = PurgeJobs()
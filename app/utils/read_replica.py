@@ -0,0 +1,169 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.config import settings
+from app.database.database import (
+    IS_SQLITE,
+    REPLICA_URL,
+    async_session_maker_read,
+    async_session_maker_replica,
+    replica_engine,
+)
+from app.utils.timing import timing_summary
+
+# Задержка реплики PostgreSQL: ноль, если она воспроизвела всё полученное
+# (иначе у простаивающего основного сервера реплика казалась бы отстающей)
+REPLICA_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+def copy_sqlite(source_path: str, replica_path: str) -> None:
+    """Consistent copy of a live SQLite database made with the online backup API.
+
+    The copy is written next to the replica and moved over it, so readers
+    of the old copy finish on the file they opened.
+    """
+    partial = f"{replica_path}.partial"
+    source = sqlite3.connect(source_path, timeout=settings.SQLITE_BUSY_TIMEOUT_MS / 1000)
+    copy = sqlite3.connect(partial)
+    try:
+        source.backup(copy)
+        # Без WAL: у копии не должно быть файлов -wal/-shm от прежнего файла
+        copy.execute("PRAGMA journal_mode=DELETE")
+    finally:
+        copy.close()
+        source.close()
+    os.replace(partial, replica_path)
+
+
+class ReadReplica:
+    """Routes read-only sessions to the replica while it is fresh enough.
+
+    A read goes to the primary when there is no replica yet, when it lags
+    more than READ_REPLICA_MAX_LAG_SECONDS, or when the same client has a
+    write in flight or one newer than the replica (read-your-writes).
+    """
+
+    def __init__(self, max_lag: float, refresh_seconds: float, history_size: int = 1000):
+        self.max_lag = max_lag
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        # Момент, по состоянию на который у реплики есть все данные
+        self.as_of: Optional[float] = None
+        # Клиент -> [записей в работе, время окончания последней]
+        self._writes: dict[str, list] = {}
+        self.replica_reads = 0
+        self.primary_reads = {"unavailable": 0, "stale": 0, "recent_write": 0}
+        self.refreshes = 0
+        self.refresh_errors = 0
+        self._refresh_times: deque[float] = deque(maxlen=history_size)
+
+    @property
+    def enabled(self) -> bool:
+        return async_session_maker_replica is not None
+
+    def lag(self) -> Optional[float]:
+        return None if self.as_of is None else max(time.time() - self.as_of, 0.0)
+
+    def begin_write(self, client: Optional[str]) -> None:
+        if not self.enabled or client is None:
+            return
+        with self._lock:
+            self._writes.setdefault(client, [0, 0.0])[0] += 1
+
+    def end_write(self, client: Optional[str]) -> None:
+        if not self.enabled or client is None:
+            return
+        now = time.time()
+        with self._lock:
+            entry = self._writes[client]
+            entry[0] -= 1
+            entry[1] = now
+            if len(self._writes) > 1024:
+                # Запись старше допустимой задержки уже есть в любой реплике,
+                # которую разрешено читать
+                self._writes = {
+                    key: value for key, value in self._writes.items()
+                    if value[0] or value[1] >= now - self.max_lag
+                }
+
+    def session_maker(self, client: Optional[str]) -> async_sessionmaker:
+        """Session factory for a read-only request of ``client``"""
+        if not self.enabled:
+            return async_session_maker_read
+        with self._lock:
+            as_of = self.as_of
+            pending, written_at = self._writes.get(client, (0, 0.0)) if client else (0, 0.0)
+            if as_of is None:
+                reason = "unavailable"
+            elif time.time() - as_of > self.max_lag:
+                reason = "stale"
+            elif pending or written_at >= as_of:
+                reason = "recent_write"
+            else:
+                self.replica_reads += 1
+                return async_session_maker_replica
+            self.primary_reads[reason] += 1
+        return async_session_maker_read
+
+    async def refresh(self) -> None:
+        """Re-copy the SQLite replica, or measure the lag of a server replica"""
+        started = time.time()
+        try:
+            if IS_SQLITE:
+                await asyncio.to_thread(
+                    copy_sqlite, make_url(settings.get_db_url).database, make_url(REPLICA_URL).database
+                )
+                # Соединения к заменённому файлу закрываются по мере возврата в пул
+                await replica_engine.dispose()
+                as_of = started
+            else:
+                async with replica_engine.connect() as connection:
+                    as_of = started - float((await connection.execute(REPLICA_LAG_SQL)).scalar())
+        except Exception:
+            with self._lock:
+                self.refresh_errors += 1
+            raise
+        with self._lock:
+            self.as_of = max(as_of, self.as_of or 0.0)
+            self.refreshes += 1
+            self._refresh_times.append(time.time() - started)
+
+    async def run_schedule(self) -> None:
+        """Refresh every READ_REPLICA_REFRESH_SECONDS until cancelled"""
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"Error refreshing read replica: {str(e)}")
+            await asyncio.sleep(self.refresh_seconds)
+
+    def metrics(self) -> dict:
+        lag = self.lag()
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "lag_seconds": None if lag is None else round(lag, 3),
+                "max_lag_seconds": self.max_lag,
+                "replica_reads": self.replica_reads,
+                "primary_reads": dict(self.primary_reads),
+                "refreshes": self.refreshes,
+                "refresh_errors": self.refresh_errors,
+                "refresh": timing_summary(self._refresh_times),
+            }
+
+
+read_replica = ReadReplica(settings.READ_REPLICA_MAX_LAG_SECONDS, settings.READ_REPLICA_REFRESH_SECONDS)
@@ -0,0 +1,176 @@
+from collections import defaultdict
+from typing import Iterable, NamedTuple, Optional
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+from app.database.database import dialect_insert
+from app.models.analytics import CategorySales, DailySales, HourlySales, MenuItemSales
+from app.models.archive import ArchivedOrder
+from app.models.order import Order
+from app.utils.menu_cache import menu_snapshot
+
+COMPLETED = "completed"
+CANCELLED = "cancelled"
+UNKNOWN_CATEGORY = "Без категории"
+
+REBUILD_CHUNK_SIZE = 500
+
+
+def _increment(db: Session, model, key_columns: Iterable[str], rows: list[dict], labels: Iterable[str] = ()) -> None:
+    """Add counters of ``rows`` to the rollup rows with the same key"""
+    if not rows:
+        return
+    key_columns = list(key_columns)
+    labels = set(labels)
+    stmt = dialect_insert(db, model)
+    counters = [column for column in rows[0] if column not in key_columns and column not in labels]
+    set_ = {column: getattr(model, column) + stmt.excluded[column] for column in counters}
+    set_.update({column: stmt.excluded[column] for column in labels})
+    db.execute(stmt.on_conflict_do_update(index_elements=key_columns, set_=set_), rows)
+
+
+class _Line(NamedTuple):
+    menu_item_id: int
+    name: str
+    quantity: int
+    price: float
+    category: Optional[str]
+
+
+def _lines(order) -> list[_Line]:
+    """Order lines of a live order or of an archived one with JSON items"""
+    if isinstance(order, ArchivedOrder):
+        return [
+            _Line(line["menu_item_id"], line["name"], line["quantity"], line["price"], line.get("category"))
+            for line in order.items
+        ]
+    return [_Line(line.menu_item_id, line.name, line.quantity, line.price, line.category) for line in order.items]
+
+
+class _Rollup:
+    """Counter deltas for a batch of orders, written with one upsert per table"""
+
+    def __init__(self):
+        self.daily = defaultdict(lambda: {"orders_completed": 0, "orders_cancelled": 0, "items_sold": 0, "revenue": 0.0})
+        self.hourly = defaultdict(lambda: {"orders_completed": 0, "revenue": 0.0})
+        self.categories = defaultdict(lambda: {"quantity": 0, "revenue": 0.0})
+        self.menu_items = defaultdict(lambda: {"quantity": 0, "revenue": 0.0})
+        self.names: dict[int, str] = {}
+
+    def add(self, order: Order, completed: int, cancelled: int, categories: dict) -> None:
+        day, hour = order.created_at.date(), order.created_at.hour
+        daily = self.daily[day]
+        daily["orders_cancelled"] += cancelled
+        if not completed:
+            return
+
+        daily["orders_completed"] += completed
+        daily["revenue"] += completed * order.total_price
+        hourly = self.hourly[(day, hour)]
+        hourly["orders_completed"] += completed
+        hourly["revenue"] += completed * order.total_price
+
+        for line in _lines(order):
+            revenue = completed * line.quantity * line.price
+            daily["items_sold"] += completed * line.quantity
+            category = line.category or categories.get(line.menu_item_id, UNKNOWN_CATEGORY)
+            self.categories[(day, category)]["quantity"] += completed * line.quantity
+            self.categories[(day, category)]["revenue"] += revenue
+            self.menu_items[(day, line.menu_item_id)]["quantity"] += completed * line.quantity
+            self.menu_items[(day, line.menu_item_id)]["revenue"] += revenue
+            self.names[line.menu_item_id] = line.name
+
+    def write(self, db: Session) -> None:
+        _increment(db, DailySales, ["day"], [
+            {"day": day, **counters} for day, counters in self.daily.items()
+        ])
+        _increment(db, HourlySales, ["day", "hour"], [
+            {"day": day, "hour": hour, **counters} for (day, hour), counters in self.hourly.items()
+        ])
+        _increment(db, CategorySales, ["day", "category"], [
+            {"day": day, "category": category, **counters}
+            for (day, category), counters in self.categories.items()
+        ])
+        _increment(db, MenuItemSales, ["day", "menu_item_id"], [
+            {"day": day, "menu_item_id": item_id, "name": self.names[item_id], **counters}
+            for (day, item_id), counters in self.menu_items.items()
+        ], labels=["name"])
+
+
+def _categories(db: Session, orders: Iterable[Order]) -> dict[int, str]:
+    """Current menu categories for lines saved before categories were snapshotted"""
+    item_ids = {line.menu_item_id for order in orders for line in _lines(order) if line.category is None}
+    if not item_ids:
+        return {}
+    return {item_id: entry.category for item_id, entry in menu_snapshot.get_many(db, item_ids).items()}
+
+
+def record_status_change(db: Session, order: Order, old_status: Optional[str], new_status: Optional[str]) -> None:
+    """Update the rollups in the caller's transaction when an order completes
+    or is cancelled, and reverse them if it leaves those statuses again.
+
+    Orders are bucketed by the hour they were placed.
+    """
+    record_status_changes(db, [(order, old_status, new_status)])
+
+
+def record_status_changes(db: Session, changes: Iterable[tuple]) -> None:
+    """Batch form of ``record_status_change`` for ``(order, old, new)`` tuples"""
+    deltas = []
+    for order, old_status, new_status in changes:
+        completed = (new_status == COMPLETED) - (old_status == COMPLETED)
+        cancelled = (new_status == CANCELLED) - (old_status == CANCELLED)
+        if completed or cancelled:
+            deltas.append((order, completed, cancelled))
+    if not deltas:
+        return
+
+    categories = _categories(db, [order for order, completed, _ in deltas if completed])
+    rollup = _Rollup()
+    for order, completed, cancelled in deltas:
+        rollup.add(order, completed, cancelled, categories)
+    rollup.write(db)
+
+
+def count_rollup_orders(db: Session) -> int:
+    """Number of live and archived orders a rebuild aggregates"""
+    return sum(
+        db.scalar(select(func.count()).select_from(model).where(model.status.in_((COMPLETED, CANCELLED))))
+        for model in (Order, ArchivedOrder)
+    )
+
+
+def rebuild_rollups(db: Session) -> int:
+    """Recompute all rollups from live and archived orders in one streaming pass.
+
+    Meant for the first deployment and for repairs, not for request paths.
+    Returns the number of orders that were aggregated.
+    """
+    for model in (DailySales, HourlySales, CategorySales, MenuItemSales):
+        db.execute(delete(model))
+
+    rollup = _Rollup()
+    total = 0
+    for model in (Order, ArchivedOrder):
+        last_id = 0
+        while True:
+            orders = db.execute(
+                select(model)
+                .where(model.id > last_id, model.status.in_((COMPLETED, CANCELLED)))
+                .order_by(model.id)
+                .limit(REBUILD_CHUNK_SIZE)
+            ).scalars().all()
+            if not orders:
+                break
+
+            categories = _categories(db, orders)
+            for order in orders:
+                rollup.add(order, int(order.status == COMPLETED), int(order.status == CANCELLED), categories)
+            total += len(orders)
+            last_id = orders[-1].id
+            db.expunge_all()
+
+    rollup.write(db)
+    db.commit()
+    return total
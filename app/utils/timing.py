@@ -0,0 +1,14 @@
+import statistics
+from typing import Iterable
+
+
+def timing_summary(samples: Iterable[float]) -> dict:
+    """Average, p95 and maximum of durations in seconds, reported in milliseconds"""
+    ordered = sorted(samples)
+    if not ordered:
+        return {"avg_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+    return {
+        "avg_ms": round(statistics.fmean(ordered) * 1000, 2),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 2),
+        "max_ms": round(ordered[-1] * 1000, 2),
+    }
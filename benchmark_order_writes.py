@@ -0,0 +1,85 @@
+"""
+Order insert throughput: one transaction per request vs group commit.
+
+Runs the same order-creation code as POST /api/orders/ with many concurrent
+callers, first committing every order on its own, then through order_writer.
+Uses a temporary database.
+Usage: python benchmark_order_writes.py [--orders 2000] [--concurrency 50]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+_db_path = os.path.join(tempfile.mkdtemp(), "bench.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_path}"
+os.environ["DB_NAME"] = _db_path
+
+from app.api.orders import _create_orders
+from app.database.database import Base, async_session_maker, engine
+from app.database.db_manager import DBManager
+from app.models.menu import MenuItem
+from app.models.table import RestaurantTable
+from app.models.user import User  # noqa: F401 - нужен для внешнего ключа orders.waiter_id
+from app.schemes.order import OrderCreate
+from app.utils.order_writer import order_writer
+
+ORDER = OrderCreate(table_id=1, items=[{"menu_item_id": 1, "quantity": 2}])
+
+
+async def _setup() -> None:
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    async with async_session_maker() as session:
+        session.add(RestaurantTable(table_number=1, seats=4))
+        session.add(MenuItem(name="Dish", price=10.0, category="Main"))
+        await session.commit()
+
+
+async def _per_request() -> None:
+    async with DBManager(session_factory=async_session_maker) as db:
+        await db.run_sync(_create_orders, [(ORDER,)])
+        await db.commit()
+
+
+async def _grouped() -> None:
+    await order_writer.submit(_create_orders, ORDER)
+
+
+async def _measure(name: str, create, orders: int, concurrency: int) -> None:
+    remaining = iter(range(orders))
+
+    async def client() -> None:
+        for _ in remaining:
+            await create()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    print(f"{name:<12} {orders / elapsed:>8.1f} orders/s   ({elapsed:.2f} s)")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--orders", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    await _setup()
+    print(f"{args.orders} orders, {args.concurrency} concurrent clients")
+    await _measure("per-request", _per_request, args.orders, args.concurrency)
+    order_writer.start()
+    await _measure("grouped", _grouped, args.orders, args.concurrency)
+    await order_writer.stop()
+    metrics = order_writer.metrics()
+    print(f"batches {metrics['batches']}, avg batch {metrics['avg_batch']}, largest {metrics['largest_batch']}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,78 @@
+"""
+List read throughput: ORM hydration vs column projection in BaseRepository.
+
+Reads the whole menu the way GET /api/menu/ does, first by loading MenuItem
+objects and validating each one (the previous get_filtered), then through
+the repository, which selects only the schema columns and validates the rows
+with one cached TypeAdapter. Uses a temporary database.
+Usage: python benchmark_projection.py [--rows 20000] [--repeat 5]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+_db_path = os.path.join(tempfile.mkdtemp(), "bench.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_path}"
+os.environ["DB_NAME"] = _db_path
+
+from sqlalchemy import select
+
+from app.database.database import Base, async_session_maker, engine
+from app.models.menu import MenuItem
+from app.models.user import User  # noqa: F401 - нужен для внешнего ключа orders.waiter_id
+from app.repositories.menu import MenuRepository
+from app.schemes.menu import MenuItemResponse
+
+
+async def _setup(rows: int) -> None:
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    async with async_session_maker() as session:
+        session.add_all([
+            MenuItem(name=f"Dish {i}", description=f"Description {i}", price=i % 50 + 0.5, category=f"Category {i % 20}")
+            for i in range(rows)
+        ])
+        await session.commit()
+
+
+async def _hydrated() -> list:
+    async with async_session_maker() as session:
+        result = await session.execute(select(MenuItem).order_by(MenuItem.id))
+        return [MenuItemResponse.model_validate(model, from_attributes=True) for model in result.scalars().all()]
+
+
+async def _projected() -> list:
+    async with async_session_maker() as session:
+        return await MenuRepository(session).get_all()
+
+
+async def _measure(name: str, read, repeat: int) -> None:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        rows = len(await read())
+        best = min(best, time.perf_counter() - started)
+    print(f"{name:<10} {rows / best:>10.0f} rows/s   (best of {repeat}: {best * 1000:.1f} ms)")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    await _setup(args.rows)
+    print(f"{args.rows} menu items")
+    await _measure("hydrated", _hydrated, args.repeat)
+    await _measure("projected", _projected, args.repeat)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
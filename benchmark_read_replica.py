@@ -0,0 +1,137 @@
+"""
+Order write latency while history pages are read from the primary or a replica.
+
+Readers page through all orders the way GET /api/orders/ does, writers
+commit new orders one by one. In the replica run the readers use a copy of
+the database refreshed with the SQLite backup API, as READ_REPLICA_ENABLED
+does. Every run uses a fresh temporary database.
+Usage: python benchmark_read_replica.py [--seconds 5] [--readers 4] [--writers 2]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.database.database import Base, apply_storage_profile, make_read_only
+from app.models.order import Order, OrderItem
+from app.models.table import RestaurantTable
+from app.models.user import User  # noqa: F401 - нужен для внешнего ключа orders.waiter_id
+from app.repositories.orders import OrdersRepository
+from app.utils.read_replica import copy_sqlite
+from app.utils.timing import timing_summary
+
+SEED_ORDERS = 20000
+PAGE_SIZE = 200
+REFRESH_SECONDS = 1
+
+
+def _order(status: str) -> Order:
+    return Order(
+        table_id=1,
+        total_price=10.0,
+        status=status,
+        items=[OrderItem(menu_item_id=1, name="Dish", price=10.0, quantity=1)],
+    )
+
+
+async def _writer(session_maker, deadline: float, latencies: list) -> None:
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        async with session_maker() as session:
+            session.add(_order("pending"))
+            await session.commit()
+        latencies.append(time.perf_counter() - started)
+
+
+async def _reader(session_maker, deadline: float, stats: dict) -> None:
+    while time.perf_counter() < deadline:
+        after_id = None
+        while time.perf_counter() < deadline:
+            async with session_maker() as session:
+                _, after_id = await OrdersRepository(session).get_recent_page(limit=PAGE_SIZE, after_id=after_id)
+            stats["pages"] += 1
+            if after_id is None:
+                break
+
+
+async def _refresh(path: str, replica_path: str, replica_engine, deadline: float) -> None:
+    while time.perf_counter() < deadline:
+        await asyncio.sleep(REFRESH_SECONDS)
+        await asyncio.to_thread(copy_sqlite, path, replica_path)
+        await replica_engine.dispose()
+
+
+async def run_profile(name: str, replica: bool, args) -> None:
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    url = f"sqlite+aiosqlite:///{path}"
+    write_engine = create_async_engine(url, pool_size=1, max_overflow=0)
+    read_engine = create_async_engine(url, pool_size=args.readers, max_overflow=0)
+    for engine in (write_engine, read_engine):
+        event.listen(engine.sync_engine, "connect", apply_storage_profile)
+    event.listen(read_engine.sync_engine, "connect", make_read_only)
+    engines = [write_engine, read_engine]
+
+    async with write_engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    write_maker = async_sessionmaker(write_engine, expire_on_commit=False)
+    async with write_maker() as session:
+        session.add(RestaurantTable(table_number=1, seats=4))
+        await session.flush()
+        session.add_all([_order("completed") for _ in range(SEED_ORDERS)])
+        await session.commit()
+
+    read_maker = async_sessionmaker(read_engine, expire_on_commit=False)
+    deadline = time.perf_counter() + args.seconds
+    tasks = []
+    if replica:
+        replica_path = path.replace("bench.db", "bench-replica.db")
+        copy_sqlite(path, replica_path)
+        replica_engine = create_async_engine(
+            f"sqlite+aiosqlite:///{replica_path}", pool_size=args.readers, max_overflow=0
+        )
+        event.listen(replica_engine.sync_engine, "connect", make_read_only)
+        engines.append(replica_engine)
+        read_maker = async_sessionmaker(replica_engine, expire_on_commit=False)
+        tasks.append(_refresh(path, replica_path, replica_engine, deadline))
+
+    stats = {"pages": 0}
+    latencies = []
+    await asyncio.gather(
+        *tasks,
+        *(_writer(write_maker, deadline, latencies) for _ in range(args.writers)),
+        *(_reader(read_maker, deadline, stats) for _ in range(args.readers)),
+    )
+    wal_size = os.path.getsize(f"{path}-wal") if os.path.exists(f"{path}-wal") else 0
+    for engine in engines:
+        await engine.dispose()
+
+    summary = timing_summary(latencies)
+    print(
+        f"{name:<8} writes/s {len(latencies) / args.seconds:>7.1f}   "
+        f"write p95 {summary['p95_ms']:>6.1f} ms   max {summary['max_ms']:>6.1f} ms   "
+        f"history pages/s {stats['pages'] / args.seconds:>6.1f}   WAL {wal_size / 1024 / 1024:.1f} MiB"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--writers", type=int, default=2)
+    args = parser.parse_args()
+
+    print(f"{SEED_ORDERS} orders, {args.readers} history readers, {args.writers} writers, {args.seconds:g}s per run")
+    await run_profile("primary", replica=False, args=args)
+    await run_profile("replica", replica=True, args=args)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
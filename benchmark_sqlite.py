@@ -0,0 +1,134 @@
+"""
+Read throughput of SQLite while orders are being written.
+
+Compares the old setup (rollback journal, one shared pool) with the storage
+profile from settings (WAL, single writer connection, separate read pool).
+Every run uses a fresh temporary database.
+Usage: python benchmark_sqlite.py [--seconds 5] [--readers 4] [--writers 2]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.config import settings
+from app.database.database import Base, apply_storage_profile, make_read_only
+from app.models.order import Order, OrderItem
+from app.models.table import RestaurantTable
+from app.models.user import User  # noqa: F401 - нужен для внешнего ключа orders.waiter_id
+from app.repositories.orders import OrdersRepository
+
+SEED_ORDERS = 2000
+
+
+async def _seed(session_maker) -> None:
+    async with session_maker() as session:
+        session.add_all([RestaurantTable(table_number=i, seats=4) for i in range(1, 11)])
+        await session.flush()
+        session.add_all([
+            Order(
+                table_id=i % 10 + 1,
+                total_price=10.0,
+                status="completed",
+                items=[OrderItem(menu_item_id=1, name="Dish", price=10.0, quantity=1)],
+            )
+            for i in range(SEED_ORDERS)
+        ])
+        await session.commit()
+
+
+async def _writer(session_maker, deadline: float, stats: dict) -> None:
+    while time.perf_counter() < deadline:
+        try:
+            async with session_maker() as session:
+                session.add(Order(
+                    table_id=1,
+                    total_price=10.0,
+                    status="pending",
+                    items=[OrderItem(menu_item_id=1, name="Dish", price=10.0, quantity=1)],
+                ))
+                await session.commit()
+            stats["writes"] += 1
+        except OperationalError:
+            stats["write_errors"] += 1
+
+
+async def _reader(session_maker, deadline: float, stats: dict, latencies: list) -> None:
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            async with session_maker() as session:
+                await OrdersRepository(session).get_recent_page(limit=50)
+            stats["reads"] += 1
+            latencies.append(time.perf_counter() - started)
+        except OperationalError:
+            stats["read_errors"] += 1
+
+
+async def run_profile(name: str, wal: bool, args) -> None:
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    url = f"sqlite+aiosqlite:///{path}"
+    if wal:
+        settings.SQLITE_JOURNAL_MODE, settings.SQLITE_SYNCHRONOUS = "WAL", "NORMAL"
+        write_engine = create_async_engine(url, pool_size=1, max_overflow=0)
+        read_engine = create_async_engine(url, pool_size=args.readers, max_overflow=0)
+        event.listen(read_engine.sync_engine, "connect", make_read_only)
+        engines = [write_engine, read_engine]
+    else:
+        settings.SQLITE_JOURNAL_MODE, settings.SQLITE_SYNCHRONOUS = "DELETE", "FULL"
+        write_engine = read_engine = create_async_engine(
+            url, pool_size=args.readers + args.writers, max_overflow=0
+        )
+        engines = [write_engine]
+    for engine in engines:
+        event.listen(engine.sync_engine, "connect", apply_storage_profile)
+
+    async with write_engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    write_maker = async_sessionmaker(write_engine, expire_on_commit=False)
+    read_maker = async_sessionmaker(read_engine, expire_on_commit=False)
+    await _seed(write_maker)
+
+    stats = dict.fromkeys(("reads", "writes", "read_errors", "write_errors"), 0)
+    latencies = []
+    deadline = time.perf_counter() + args.seconds
+    await asyncio.gather(
+        *(_writer(write_maker, deadline, stats) for _ in range(args.writers)),
+        *(_reader(read_maker, deadline, stats, latencies) for _ in range(args.readers)),
+    )
+    for engine in engines:
+        await engine.dispose()
+
+    latencies.sort()
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else 0.0
+    print(
+        f"{name:<10} reads/s {stats['reads'] / args.seconds:>8.1f}   "
+        f"read p95 {p95 * 1000:>6.1f} ms   max {(latencies[-1] if latencies else 0) * 1000:>6.1f} ms   "
+        f"writes/s {stats['writes'] / args.seconds:>7.1f}   "
+        f"errors r/w {stats['read_errors']}/{stats['write_errors']}"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--readers", type=int, default=settings.SQLITE_READ_POOL_SIZE)
+    parser.add_argument("--writers", type=int, default=2)
+    args = parser.parse_args()
+
+    print(f"{args.readers} readers, {args.writers} writers, {args.seconds:g}s per profile")
+    await run_profile("rollback", wal=False, args=args)
+    await run_profile("wal", wal=True, args=args)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -10,9 +10,7 @@ from app.models.user import User
 from app.models.menu import MenuItem
 from app.models.table import RestaurantTable
 from app.models.order import Order
-from passlib.context import CryptContext
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.utils.password_hashing import password_hasher
 
 def init_db():
     """Инициализация БД и создание тестовых данных"""
@@ -31,7 +29,7 @@ def init_db():
         
         chef = User(
             username="chefNum1",
-            password_hash=pwd_context.hash("chef123"),
+            password_hash=password_hasher.hash("chef123"),
             full_name="Олег Козлов",
             role="chef",
             is_active=True
@@ -41,7 +39,7 @@ def init_db():
         
         waiter = User(
             username="waiterNum1",
-            password_hash=pwd_context.hash("waiter123"),
+            password_hash=password_hasher.hash("waiter123"),
             full_name="Иван Петров",
             role="waiter",
             is_active=True
@@ -51,7 +49,7 @@ def init_db():
         
         admin = User(
             username="adminNum1",
-            password_hash=pwd_context.hash("admin123"),
+            password_hash=password_hasher.hash("admin123"),
             full_name="Александр Иванович",
             role="admin",
             is_active=True
@@ -1,28 +1,70 @@
+import asyncio
 import uvicorn
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 from pathlib import Path
-from sqlalchemy import create_engine
 from sqladmin import Admin, ModelView
 
-from app.database.core import Base, engine
+from app.database.database import Base, engine, read_engine, replica_engine
 from app.database.models import User, MenuItem, Table
 
-from app.api.auth import router as auth_router
+from app.api.auth import refresh_access_cookie, router as auth_router
 from app.api.menu import router as menu_router
 from app.api.tables import router as tables_router
 from app.api.orders import router as orders_router
 from app.api.employees import router as employees_router
+from app.api.analytics import router as analytics_router
+from app.api.floor import router as floor_router
+from app.api.jobs import router as jobs_router
+from app.api.metrics import router as metrics_router
+from app.config import settings
+from app.utils.menu_cache import menu_snapshot
+from app.utils.menu_search import ensure_menu_search
+from app.utils.order_archive import run_archive_schedule
+from app.utils.order_writer import order_writer
+from app.utils.password_hashing import password_hasher
+from app.utils.read_replica import read_replica
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Запуск фоновых задач на время работы приложения"""
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+        await connection.run_sync(ensure_menu_search)
+    # Процессы bcrypt и подбор стоимости - заранее, а не на первом входе
+    await run_in_threadpool(password_hasher.start)
+    order_writer.start()
+    archive_task = None
+    if settings.ARCHIVE_INTERVAL_MINUTES > 0:
+        archive_task = asyncio.create_task(run_archive_schedule())
+    # Отчёты читают реплику только после её первого обновления
+    replica_task = asyncio.create_task(read_replica.run_schedule()) if read_replica.enabled else None
+    yield
+    if archive_task:
+        archive_task.cancel()
+    if replica_task:
+        replica_task.cancel()
+    await order_writer.stop()
+    password_hasher.shutdown()
+    # Соединения asyncpg привязаны к циклу событий, в котором открыты
+    await engine.dispose()
+    await read_engine.dispose()
+    if replica_engine is not None:
+        await replica_engine.dispose()
 
 app = FastAPI(
     title="Platter Flow - Restaurant Management",
     description="API for restaurant management system",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
-Base.metadata.create_all(bind=engine)
+# Скользящее продление cookie входа
+app.middleware("http")(refresh_access_cookie)
 
 app.add_middleware(
     CORSMiddleware,
@@ -41,6 +83,10 @@ app.include_router(menu_router)
 app.include_router(tables_router)
 app.include_router(orders_router)
 app.include_router(employees_router)
+app.include_router(analytics_router)
+app.include_router(floor_router)
+app.include_router(jobs_router)
+app.include_router(metrics_router)
 
 class UserAdmin(ModelView, model=User):
     """Админ-панель для пользователей"""
@@ -56,6 +102,12 @@ class MenuItemAdmin(ModelView, model=MenuItem):
     name_plural = "Меню"
     icon = "fa-solid fa-utensils"
 
+    async def after_model_change(self, data, model, is_created, request):
+        menu_snapshot.invalidate()
+
+    async def after_model_delete(self, model, request):
+        menu_snapshot.invalidate()
+
 class TableAdmin(ModelView, model=Table):
     """Админ-панель для столов"""
     column_list = [Table.id, Table.table_number, Table.seats, Table.is_occupied]
@@ -9,7 +9,7 @@ from alembic import context
 from app.database.database import Base
 from app.config import settings
 
-from app.models.users import UserModel
+from app.models.user import User
 from app.models.roles import RoleModel
 
 sqlalchemy_url = settings.get_db_url
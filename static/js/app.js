@@ -7,6 +7,20 @@ let cart = [];
 let allMenuItems = [];
 let editingEmployeeId = null;
 let waiterNotifications = []; 
+const ACTIVE_ORDER_STATUSES = ['pending', 'confirmed', 'ready'];
+let ordersById = new Map();
+let orderStream = null;
+let floorEtag = null;
+
+// Сессия истекла или отозвана: возвращаемся на экран входа
+const nativeFetch = window.fetch.bind(window);
+window.fetch = async (...args) => {
+    const response = await nativeFetch(...args);
+    if (response.status === 401 && currentUser) {
+        handleLogout();
+    }
+    return response;
+};
 
 const authSection = document.getElementById('authSection');
 const appSection = document.getElementById('appSection');
@@ -137,19 +151,13 @@ async function handleLogin() {
             loadMenuItems();
             
             if (data.role === 'chef') {
-                loadOrders();
-                setInterval(() => {
-                    if (currentUser && currentUser.role === 'chef') {
-                        loadOrders();
-                    }
-                }, 2000);
+                connectOrderStream();
             }
             
             if (data.role === 'waiter') {
                 setInterval(() => {
                     if (currentUser && currentUser.role === 'waiter') {
                         loadTablesForStatus();
-                        checkForReadyOrders();
                     }
                 }, 3000);
             }
@@ -195,6 +203,10 @@ async function handleLogin() {
 }
 
 function handleLogout() {
+    // Токен отзывается на сервере, cookie удаляется ответом
+    nativeFetch(`${API_URL}/api/auth/logout`, { method: 'POST' }).catch(() => {});
+    disconnectOrderStream();
+    floorEtag = null;
     currentUser = null;
     cart = [];
     waiterNotifications = [];
@@ -232,24 +244,6 @@ function handleTabSwitch(btn) {
     }
 }
 
-async function checkForReadyOrders() {
-    try {
-        const response = await fetch(`${API_URL}/api/orders/`);
-        const orders = await response.json();
-        
-        orders.forEach(order => {
-            if (order.status === 'ready') {
-                if (!waiterNotifications.includes(order.id)) {
-                    waiterNotifications.push(order.id);
-                    showWaiterNotification(`🍽️ Заказ #${order.id} готов! (Стол №${order.table_id})`, order.id);
-                }
-            }
-        });
-    } catch (error) {
-        console.error('Ошибка проверки готовых заказов:', error);
-    }
-}
-
 function showWaiterNotification(message, orderId) {
     const notification = document.createElement('div');
     notification.style.cssText = `
@@ -328,12 +322,32 @@ async function completeOrder(orderId) {
     }
 }
 
+// Столы вместе с открытыми заказами приходят одним запросом.
+// Если ETag не изменился, перерисовывать нечего.
 async function loadTablesForStatus() {
     try {
-        const response = await fetch(`${API_URL}/api/tables/`);
-        const tables = await response.json();
+        const response = await fetch(`${API_URL}/api/floor`);
+        if (!response.ok) {
+            throw new Error(`Ошибка загрузки зала: ${response.status}`);
+        }
         
         const tablesStatusContent = document.getElementById('tablesStatusContent');
+        const etag = response.headers.get('ETag');
+        if (etag && etag === floorEtag && tablesStatusContent.children.length > 0) {
+            return;
+        }
+        floorEtag = etag;
+        const tables = await response.json();
+        
+        tables.forEach(table => {
+            table.ready_order_ids.forEach(orderId => {
+                if (!waiterNotifications.includes(orderId)) {
+                    waiterNotifications.push(orderId);
+                    showWaiterNotification(`🍽️ Заказ #${orderId} готов! (Стол №${table.table_number})`, orderId);
+                }
+            });
+        });
+        
         tablesStatusContent.innerHTML = '';
         
         if (tables.length === 0) {
@@ -354,6 +368,7 @@ async function loadTablesForStatus() {
             frontFace.innerHTML = `
                 <div class="number">#${table.table_number}</div>
                 <div class="seats">${table.seats} мест</div>
+                ${formatFloorOrders(table)}
                 <button class="btn ${table.is_occupied ? 'btn-success' : 'btn-danger'}" 
                         style="width: 100%; font-size: 13px; padding: 8px;" 
                         onclick="toggleTableStatus(${table.id}, ${!table.is_occupied})">
@@ -383,6 +398,16 @@ async function loadTablesForStatus() {
     }
 }
 
+function formatFloorOrders(table) {
+    if (table.open_orders === 0) {
+        return '';
+    }
+    // Сервер отдаёт время в UTC без указания зоны
+    const openedAt = new Date(`${table.oldest_open_at}Z`).toLocaleTimeString([], { hour: '2-digit', minute: '2-digit' });
+    const ready = table.ready_orders > 0 ? ` · 🟢 готово: ${table.ready_orders}` : '';
+    return `<div class="seats">📋 ${table.open_orders} с ${openedAt}${ready}</div>`;
+}
+
 async function toggleTableStatus(tableId, isOccupied) {
     try {
         const card = document.querySelector(`[data-table-id="${tableId}"]`);
@@ -417,42 +442,13 @@ async function loadMenuItems() {
         const items = await response.json();
         allMenuItems = items;
         
-        const menuContent = document.getElementById('menuContent');
-        menuContent.innerHTML = '';
-        
-        if (items.length === 0) {
-            menuContent.innerHTML = '<p style="grid-column: 1/-1; text-align: center; color: #999;">Нет доступных пунктов меню</p>';
-            return;
+        const searchInput = document.getElementById('menuSearch');
+        if (searchInput && searchInput.value.trim()) {
+            await searchMenuItems(searchInput.value);
+        } else {
+            renderMenuItems(items);
         }
         
-        items.forEach(item => {
-            const itemEl = document.createElement('div');
-            itemEl.className = 'item';
-            
-            let html = `
-                <div class="name">${item.name}</div>
-                <div class="desc">${item.description || 'Без описания'}</div>
-                <div class="meta">₽${item.price.toFixed(2)}</div>
-                <small style="color: #999; display: block; margin-bottom: 10px;">${item.category}</small>
-            `;
-            
-            if (currentUser && currentUser.role === 'waiter') {
-                html += `
-                    <button
-                        class="btn btn-primary"
-                        style="font-size: 12px; padding: 8px;"
-                        data-item-id="${item.id}"
-                        onclick="addToCartById(this.dataset.itemId)"
-                    >
-                        📋 Добавить в заказ
-                    </button>
-                `;
-            }
-            
-            itemEl.innerHTML = html;
-            menuContent.appendChild(itemEl);
-        });
-        
         document.getElementById('statOrders').textContent = items.length;
     } catch (error) {
         console.error('Ошибка загрузки меню:', error);
@@ -460,6 +456,69 @@ async function loadMenuItems() {
     }
 }
 
+function renderMenuItems(items) {
+    const menuContent = document.getElementById('menuContent');
+    menuContent.innerHTML = '';
+    
+    if (items.length === 0) {
+        menuContent.innerHTML = '<p style="grid-column: 1/-1; text-align: center; color: #999;">Нет доступных пунктов меню</p>';
+        return;
+    }
+    
+    items.forEach(item => {
+        const itemEl = document.createElement('div');
+        itemEl.className = 'item';
+        
+        let html = `
+            <div class="name">${item.name}</div>
+            <div class="desc">${item.description || 'Без описания'}</div>
+            <div class="meta">₽${item.price.toFixed(2)}</div>
+            <small style="color: #999; display: block; margin-bottom: 10px;">${item.category}</small>
+        `;
+        
+        if (currentUser && currentUser.role === 'waiter') {
+            html += `
+                <button
+                    class="btn btn-primary"
+                    style="font-size: 12px; padding: 8px;"
+                    data-item-id="${item.id}"
+                    onclick="addToCartById(this.dataset.itemId)"
+                >
+                    📋 Добавить в заказ
+                </button>
+            `;
+        }
+        
+        itemEl.innerHTML = html;
+        menuContent.appendChild(itemEl);
+    });
+}
+
+// Поиск выполняет сервер, браузер только показывает найденное
+let menuSearchTimer = null;
+
+async function searchMenuItems(query) {
+    if (!query.trim()) {
+        renderMenuItems(allMenuItems);
+        return;
+    }
+    try {
+        const response = await fetch(`${API_URL}/api/menu/search?q=${encodeURIComponent(query)}`);
+        if (!response.ok) {
+            throw new Error(`Ошибка поиска: ${response.status}`);
+        }
+        const result = await response.json();
+        renderMenuItems(result.items);
+    } catch (error) {
+        console.error('Ошибка поиска по меню:', error);
+    }
+}
+
+document.getElementById('menuSearch')?.addEventListener('input', (e) => {
+    clearTimeout(menuSearchTimer);
+    menuSearchTimer = setTimeout(() => searchMenuItems(e.target.value), 200);
+});
+
 async function loadMenuForManagement() {
     try {
         const response = await fetch(`${API_URL}/api/menu/`);
@@ -1011,10 +1070,71 @@ async function createOrder() {
     }
 }
 
-async function loadOrders() {
+// Доска повара: один снимок при подключении, дальше только события.
+// При обрыве EventSource сам переподключается с Last-Event-ID,
+// и сервер досылает пропущенные события или новый снимок.
+function connectOrderStream() {
+    disconnectOrderStream();
+    orderStream = new EventSource(`${API_URL}/api/orders/stream`);
+    
+    orderStream.addEventListener('snapshot', (e) => {
+        ordersById = new Map(JSON.parse(e.data).map(order => [order.id, order]));
+        renderOrders();
+    });
+    
+    // На доске только активные заказы: завершённые и отменённые убираются
+    const upsertOrder = (e) => {
+        const order = JSON.parse(e.data);
+        if (ACTIVE_ORDER_STATUSES.includes(order.status)) {
+            ordersById.set(order.id, order);
+        } else {
+            ordersById.delete(order.id);
+        }
+        renderOrders();
+    };
+    orderStream.addEventListener('created', upsertOrder);
+    orderStream.addEventListener('updated', upsertOrder);
+    
+    orderStream.addEventListener('deleted', (e) => {
+        ordersById.delete(JSON.parse(e.data).id);
+        renderOrders();
+    });
+    
+    const stream = orderStream;
+    stream.onerror = () => {
+        if (stream.readyState !== EventSource.CLOSED) {
+            console.warn('⚠️ Поток заказов прерван, переподключение...');
+            return;
+        }
+        // После ответа не 200 (например, 401 на истёкшую cookie) EventSource
+        // больше не переподключается. Проверяем сессию обычным запросом:
+        // на 401 обёртка fetch вернёт на экран входа, иначе подключаемся заново
+        const reconnect = () => {
+            if (currentUser && orderStream === stream) {
+                setTimeout(() => {
+                    if (currentUser && orderStream === stream) connectOrderStream();
+                }, 3000);
+            }
+        };
+        fetch(`${API_URL}/api/floor`)
+            .then(response => {
+                if (response.status !== 401) reconnect();
+            })
+            .catch(reconnect);
+    };
+}
+
+function disconnectOrderStream() {
+    if (orderStream) {
+        orderStream.close();
+        orderStream = null;
+    }
+    ordersById = new Map();
+}
+
+function renderOrders() {
     try {
-        const response = await fetch(`${API_URL}/api/orders/`);
-        const orders = await response.json();
+        const orders = Array.from(ordersById.values()).sort((a, b) => a.id - b.id);
         
         const ordersList = document.getElementById('ordersList');
         ordersList.innerHTML = '';
@@ -1147,11 +1267,10 @@ async function markOrderReady(orderId) {
         await new Promise(resolve => setTimeout(resolve, 500));
         
         alert('✅ Заказ отмечен как готовый!');
-        loadOrders();
     } catch (error) {
         console.error('Ошибка обновления заказа:', error);
         alert('❌ Ошибка: ' + error.message);
-        loadOrders();
+        renderOrders();
     }
 }
 
@@ -1199,7 +1318,7 @@ async function deleteOrder(orderId) {
     } catch (error) {
         console.error('Ошибка удаления заказа:', error);
         alert('❌ Ошибка сети: ' + error.message);
-        loadOrders();
+        renderOrders();
     }
 }
 
@@ -0,0 +1,53 @@
+import asyncio
+import os
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.database.database import Base
+# Модели регистрируют свои таблицы в Base.metadata при импорте
+from app.models import analytics, archive, change_log, menu, order, roles, table, user  # noqa: F401
+
+
+@pytest.fixture(scope="session")
+def postgres_url(tmp_path_factory):
+    """URL of a PostgreSQL database the tests may wipe.
+
+    TEST_POSTGRES_URL wins; without it a throwaway local server is started
+    with the ``pgserver`` package, and the tests are skipped if it is missing.
+    """
+    url = os.environ.get("TEST_POSTGRES_URL")
+    if url:
+        yield url
+        return
+
+    pgserver = pytest.importorskip("pgserver", reason="set TEST_POSTGRES_URL or install pgserver")
+    server = pgserver.get_server(tmp_path_factory.mktemp("pgdata"), cleanup_mode="stop")
+    try:
+        yield server.get_uri().replace("postgresql://", "postgresql+asyncpg://", 1)
+    finally:
+        server.cleanup()
+
+
+@pytest.fixture
+def pg_engine(postgres_url):
+    """Async engine over freshly created tables, dropped after the test"""
+    # Без пула: каждый asyncio.run работает в своём цикле событий
+    engine = create_async_engine(postgres_url, poolclass=NullPool)
+
+    async def create():
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.drop_all)
+            await connection.run_sync(Base.metadata.create_all)
+
+    async def drop():
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.drop_all)
+        await engine.dispose()
+
+    asyncio.run(create())
+    try:
+        yield engine
+    finally:
+        asyncio.run(drop())
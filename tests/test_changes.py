@@ -0,0 +1,39 @@
+import asyncio
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.models.change_log import ChangeLog
+from app.utils.changes import current_cursor, record_changes
+
+pytestmark = pytest.mark.postgresql
+
+
+async def _commit_out_of_order(engine) -> tuple[list[int], list[int]]:
+    session_maker = async_sessionmaker(engine)
+    async with session_maker() as first, session_maker() as second, session_maker() as reader:
+        # Первый писатель получает id из последовательности раньше, а фиксируется позже
+        await first.run_sync(record_changes, "orders", [1])
+        await second.run_sync(record_changes, "orders", [2])
+        await second.commit()
+
+        cursor = await reader.run_sync(current_cursor)
+        await reader.commit()
+        await first.commit()
+
+        after_cursor = (await reader.execute(
+            select(ChangeLog.entity_id).where(ChangeLog.id > cursor)
+        )).scalars().all()
+        journal = (await reader.execute(
+            select(ChangeLog.entity_id).order_by(ChangeLog.id)
+        )).scalars().all()
+    return list(after_cursor), list(journal)
+
+
+def test_journal_ids_follow_commit_order(pg_engine):
+    after_cursor, journal = asyncio.run(_commit_out_of_order(pg_engine))
+
+    assert after_cursor == [1]
+    assert journal == [2, 1]
+
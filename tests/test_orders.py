@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.api.orders import _update_order_status
+from app.models.order import Order
+from app.models.table import RestaurantTable
+from app.schemes.order import OrderUpdate
+
+pytestmark = pytest.mark.postgresql
+
+
+async def _race(engine, first_change: OrderUpdate, second_change: OrderUpdate):
+    """Apply two status changes to one order from concurrent transactions.
+
+    The second UPDATE waits for the first one's row lock, then PostgreSQL
+    re-checks its WHERE against the committed row.
+    """
+    session_maker = async_sessionmaker(engine)
+    async with session_maker() as db:
+        db.add(RestaurantTable(id=1, table_number=1, seats=4, open_order_count=1))
+        await db.flush()
+        db.add(Order(id=1, table_id=1, status="pending", total_price=10.0))
+        await db.commit()
+
+    async with session_maker() as first, session_maker() as second:
+        [first_outcome] = await first.run_sync(_update_order_status, [(1, first_change)])
+        racing = asyncio.create_task(second.run_sync(_update_order_status, [(1, second_change)]))
+        await asyncio.sleep(0.2)
+        assert not racing.done()
+        await first.commit()
+        [second_outcome] = await racing
+        await second.commit()
+
+        version = (await second.get(Order, 1)).version
+    return first_outcome, second_outcome, version
+
+
+def test_stale_version_is_a_conflict(pg_engine):
+    first, second, version = asyncio.run(_race(
+        pg_engine, OrderUpdate(status="confirmed", version=1), OrderUpdate(status="cancelled", version=1),
+    ))
+
+    assert first[0]["status"] == "confirmed"
+    assert isinstance(second, HTTPException)
+    assert second.status_code == 409
+    assert second.detail["message"] == "Order was modified by another request"
+    assert second.detail["version"] == 2
+    assert version == 2
+
+
+def test_transition_is_checked_against_the_committed_status(pg_engine):
+    first, second, version = asyncio.run(_race(
+        pg_engine, OrderUpdate(status="completed"), OrderUpdate(status="cancelled"),
+    ))
+
+    assert first[0]["status"] == "completed"
+    assert isinstance(second, HTTPException)
+    assert second.status_code == 409
+    assert second.detail["message"] == "Cannot change status from completed to cancelled"
+    assert version == 2
@@ -0,0 +1,63 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import selectinload
+
+from app.models.analytics import CategorySales, DailySales
+from app.models.order import Order, OrderItem
+from app.models.table import RestaurantTable
+from app.utils.sales_rollups import record_status_change
+
+pytestmark = pytest.mark.postgresql
+
+CREATED_AT = datetime(2026, 10, 18, 12, 30)
+
+
+async def _complete_concurrently(engine):
+    """Complete two orders of the same day from concurrent transactions.
+
+    Both upserts target the same rollup keys: the second one waits on the
+    unique index and then adds to the row the first one inserted.
+    """
+    session_maker = async_sessionmaker(engine)
+    async with session_maker() as db:
+        db.add(RestaurantTable(id=1, table_number=1, seats=4))
+        await db.flush()
+        for order_id, price in ((1, 10.0), (2, 15.0)):
+            db.add(Order(
+                id=order_id, table_id=1, status="completed", total_price=price, created_at=CREATED_AT,
+                items=[OrderItem(menu_item_id=order_id, name=f"Dish{order_id}", price=price, quantity=1, category="Main")],
+            ))
+        await db.commit()
+
+    async with session_maker() as first, session_maker() as second:
+        orders = {}
+        for session, order_id in ((first, 1), (second, 2)):
+            orders[order_id] = (await session.execute(
+                select(Order).options(selectinload(Order.items)).where(Order.id == order_id)
+            )).scalar_one()
+
+        await first.run_sync(record_status_change, orders[1], None, "completed")
+        racing = asyncio.create_task(second.run_sync(record_status_change, orders[2], None, "completed"))
+        await asyncio.sleep(0.2)
+        assert not racing.done()
+        await first.commit()
+        await racing
+        await second.commit()
+
+    async with session_maker() as db:
+        daily = (await db.execute(select(DailySales))).scalars().all()
+        categories = (await db.execute(select(CategorySales))).scalars().all()
+        return [(row.orders_completed, row.items_sold, row.revenue) for row in daily], [
+            (row.category, row.quantity, row.revenue) for row in categories
+        ]
+
+
+def test_concurrent_upserts_add_up(pg_engine):
+    daily, categories = asyncio.run(_complete_concurrently(pg_engine))
+
+    assert daily == [(2, 2, 25.0)]
+    assert categories == [("Main", 2, 25.0)]